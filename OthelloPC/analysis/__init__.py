@@ -10,6 +10,13 @@ Analysis Package for STM32 Othello PC Client
 """
 
 from .deepseek_client import DeepSeekClient, AnalysisCache
-from .pdf_generator import PDFReportGenerator
 
-__all__ = ['DeepSeekClient', 'AnalysisCache', 'PDFReportGenerator']
\ No newline at end of file
+__all__ = ['DeepSeekClient', 'AnalysisCache', 'PDFReportGenerator']
+
+
+def __getattr__(name):
+    """延迟导入PDFReportGenerator (reportlab仅在导出PDF时加载)"""
+    if name == 'PDFReportGenerator':
+        from .pdf_generator import PDFReportGenerator
+        return PDFReportGenerator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
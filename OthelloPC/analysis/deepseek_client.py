@@ -9,19 +9,163 @@ DeepSeek AI分析客户端
 @date: 2025-11-22
 """
 
+import asyncio
+import hashlib
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-import time
-from typing import Optional, Dict, List
+import os
+import struct
+from typing import Optional, Dict, List, Callable, Iterator, Mapping, Tuple
 import logging
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
+
+from game.game_state import GameState, Move, PieceType, GameStatus, unpack_board_values
+from utils.file_utils import atomic_write_json
+
+try:
+    import orjson  # 可选依赖: 更快的JSON编解码
+except ImportError:
+    orjson = None
+
+# 请求体为预先序列化的JSON字节串时使用的请求头
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# 玩家名称 (用于生成棋谱描述)
+PLAYER_LABELS_ZH = {PieceType.BLACK: "黑", PieceType.WHITE: "白"}
+PLAYER_LABELS_EN = {PieceType.BLACK: "Black", PieceType.WHITE: "White"}
+
+# 胜负结果文本 (未结束的状态统一显示为进行中)
+WINNER_TEXT_ZH: Mapping[GameStatus, str] = MappingProxyType({
+    GameStatus.BLACK_WIN: "黑方获胜",
+    GameStatus.WHITE_WIN: "白方获胜",
+    GameStatus.DRAW: "平局",
+    GameStatus.PLAYING: "游戏进行中"
+})
+WINNER_TEXT_EN: Mapping[GameStatus, str] = MappingProxyType({
+    GameStatus.BLACK_WIN: "Black Wins",
+    GameStatus.WHITE_WIN: "White Wins",
+    GameStatus.DRAW: "Draw",
+    GameStatus.PLAYING: "Game in Progress"
+})
+
+# 棋盘文本格式 (按PieceType.value索引，每个棋子符号后带一个空格)
+BOARD_COLUMN_HEADER = "   A B C D E F G H"
+BOARD_GLYPHS = ("· ", "● ", "○ ")
+
+# 分析提示模板
+ANALYSIS_PROMPT_ZH = """你是一位专业的黑白棋(Othello)分析师。请对以下游戏进行深入分析:
+
+{game_description}
+
+请从以下角度进行详细分析:
+1. 开局阶段: 分析开局走法的优劣，是否符合黑白棋基本原理
+2. 中局发展: 评估中局的关键转折点，分析重要走法的得失
+3. 残局技巧: 分析残局阶段的技术要点和胜负手
+4. 整体战术: 评估双方的整体战略思路和执行效果
+5. 关键走法: 指出影响胜负的关键走法和失误
+6. 学习建议: 给出具体的改进建议和学习要点
+
+请用专业但通俗的语言进行分析，让普通玩家也能理解。分析应该具体、客观，并给出实用的建议。"""
+
+ANALYSIS_PROMPT_EN = """You are a professional Othello/Reversi analyst. Please provide a comprehensive analysis of the following game:
+
+{game_description}
+
+Please analyze from the following perspectives:
+1. Opening Play: Evaluate the opening moves and adherence to basic Othello principles
+2. Middle Game: Assess key turning points and critical move evaluations
+3. Endgame Technique: Analyze endgame tactics and decisive moves
+4. Overall Strategy: Evaluate both players' strategic approaches and execution
+5. Key Moves: Identify game-changing moves and critical mistakes
+6. Learning Points: Provide specific improvement suggestions and study recommendations
+
+Use professional but accessible language that general players can understand. The analysis should be specific, objective, and provide practical advice."""
+
+POSITION_PROMPT_ZH = """你是一位专业的黑白棋(Othello)分析师。请对以下局面进行分析:
+
+{position_description}
+
+请从以下角度分析当前局面:
+1. 局面评估: 分析当前局面的优劣形势
+2. 关键区域: 指出棋盘上的关键位置和控制要点
+3. 可选走法: 评估主要的可选走法及其后果
+4. 战术建议: 给出具体的战术建议和注意事项
+5. 风险评估: 分析可能的风险和机会
+
+请用简洁明了的语言进行分析，重点突出实用性。"""
+
+POSITION_PROMPT_EN = """You are a professional Othello/Reversi analyst. Please analyze the following position:
+
+{position_description}
+
+Please analyze the current position from these perspectives:
+1. Position Evaluation: Assess the current advantage/disadvantage
+2. Key Areas: Identify critical squares and control points on the board
+3. Move Options: Evaluate main move choices and their consequences
+4. Tactical Advice: Provide specific tactical recommendations and considerations
+5. Risk Assessment: Analyze potential risks and opportunities
+
+Use clear and concise language with focus on practical insights."""
+
+
+def _split_template(template: str, field: str) -> tuple:
+    """在唯一的占位符处拆分模板，返回 (前缀, 后缀)"""
+    prefix, suffix = template.split("{" + field + "}")
+    return prefix, suffix
+
+# 模板只有一个占位符，预先拆分后直接拼接，无需每次调用format解析模板
+ANALYSIS_PROMPT_PARTS = {
+    'zh': _split_template(ANALYSIS_PROMPT_ZH, 'game_description'),
+    'en': _split_template(ANALYSIS_PROMPT_EN, 'game_description')
+}
+POSITION_PROMPT_PARTS = {
+    'zh': _split_template(POSITION_PROMPT_ZH, 'position_description'),
+    'en': _split_template(POSITION_PROMPT_EN, 'position_description')
+}
+
+
+def _dumps_json(obj) -> bytes:
+    """序列化为UTF-8 JSON字节串 (优先使用orjson)"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+def _loads_json(data: bytes):
+    """解析JSON字节串 (优先使用orjson，解析失败抛出json.JSONDecodeError)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _parse_json_response(response) -> Dict:
+    """解析响应体JSON (优先使用orjson，解析失败抛出json.JSONDecodeError)"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+@lru_cache(maxsize=256)
+def _format_board_key(board_key: bytes) -> str:
+    """根据压缩棋盘 (GameState.pack) 生成棋盘文本，相同局面直接命中缓存"""
+    rows = [BOARD_COLUMN_HEADER]
+    for row_num, values in enumerate(unpack_board_values(board_key), 1):
+        cells = "".join(BOARD_GLYPHS[value] for value in values)
+        rows.append(f"{row_num}  {cells} {row_num}")
+    rows.append(BOARD_COLUMN_HEADER)
+    return "\n".join(rows)
 
-from game.game_state import GameState, Move, PieceType, GameStatus
 
 class DeepSeekClient:
     """DeepSeek AI分析客户端"""
 
-    def __init__(self, api_key: str = None, base_url: str = "https://api.deepseek.com", config=None):
+    def __init__(self, api_key: str = None, base_url: str = "https://api.deepseek.com", config=None,
+                 max_concurrency: int = 4, cache: Optional['AnalysisCache'] = None):
         """
         初始化DeepSeek客户端
 
@@ -29,6 +173,8 @@ class DeepSeekClient:
             api_key: DeepSeek API密钥 (优先使用此参数,如果为None则从config读取)
             base_url: API基础URL (优先使用此参数,如果为默认值则从config读取)
             config: Config配置对象 (可选,用于读取所有DeepSeek配置)
+            max_concurrency: 异步接口的最大并发请求数
+            cache: 分析结果缓存 (可选，用于异步接口的结果复用与并发请求合并)
         """
         # 优先使用传入的参数,其次使用config对象的配置
         if config:
@@ -53,9 +199,22 @@ class DeepSeekClient:
                 'max_tokens': 2000
             }
 
-        self.session = requests.Session()
+        # 请求体中固定不变的字段 (每次调用只需补充messages)
+        self._payload_static = {
+            'model': self.analysis_config['model'],
+            'temperature': self.analysis_config['temperature'],
+            'max_tokens': self.analysis_config['max_tokens']
+        }
+
+        self.session = self._create_session(max_concurrency)
         self.logger = logging.getLogger(__name__)
 
+        # 异步并发控制 (信号量在事件循环内延迟创建)
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        self.cache = cache
+
         # 设置请求头
         if self.api_key:
             self.session.headers.update({
@@ -63,6 +222,24 @@ class DeepSeekClient:
                 'Content-Type': 'application/json'
             })
 
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        """创建带连接池与重试策略的HTTP会话 (复用TCP/TLS连接)"""
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods={"POST"},
+            raise_on_status=False
+        )
+        pool_size = max(pool_size, 1)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
     def set_api_key(self, api_key: str):
         """设置API密钥"""
         self.api_key = api_key
@@ -116,13 +293,15 @@ class DeepSeekClient:
                 'error': f'分析过程中发生错误: {str(e)}'
             }
 
-    def analyze_position(self, game_state: GameState, language: str = 'zh') -> Optional[Dict]:
+    def analyze_position(self, game_state: GameState, language: str = 'zh',
+                         on_token: Optional[Callable[[str], None]] = None) -> Optional[Dict]:
         """
         分析当前局面
 
         Args:
             game_state: 游戏状态对象
             language: 分析语言
+            on_token: 流式回调 (可选)，设置后以流式方式请求并逐段回调生成的文本
 
         Returns:
             Dict: 局面分析结果
@@ -135,7 +314,14 @@ class DeepSeekClient:
             prompt = self._build_position_analysis_prompt(position_description, language)
 
             # 调用DeepSeek API
-            response = self._call_deepseek_api(prompt)
+            if on_token is None:
+                response = self._call_deepseek_api(prompt)
+            else:
+                chunks = []
+                for token in self._call_deepseek_api_stream(prompt):
+                    chunks.append(token)
+                    on_token(token)
+                response = "".join(chunks) or None
 
             if response:
                 return {
@@ -162,150 +348,155 @@ class DeepSeekClient:
                 'error': f'局面分析过程中发生错误: {str(e)}'
             }
 
+    async def aanalyze_game(self, game_state: GameState, language: str = 'zh') -> Optional[Dict]:
+        """分析完整游戏 (异步版本，受并发信号量限制)"""
+        return await self._arun_analysis(b'game', self.analyze_game, game_state, language)
+
+    async def aanalyze_position(self, game_state: GameState, language: str = 'zh') -> Optional[Dict]:
+        """分析当前局面 (异步版本，受并发信号量限制)"""
+        return await self._arun_analysis(b'position', self.analyze_position, game_state, language)
+
+    async def aanalyze_many(self, game_states: List[GameState], language: str = 'zh',
+                            full_game: bool = True) -> List[Optional[Dict]]:
+        """
+        并发分析多个游戏/局面
+
+        Args:
+            game_states: 游戏状态列表
+            language: 分析语言
+            full_game: True=完整游戏分析, False=局面分析
+
+        Returns:
+            List[Dict]: 与输入顺序一致的分析结果列表
+        """
+        analyze = self.aanalyze_game if full_game else self.aanalyze_position
+        return await asyncio.gather(*(analyze(state, language) for state in game_states))
+
+    async def _arun_analysis(self, kind: bytes, analyze: Callable, game_state: GameState,
+                             language: str) -> Optional[Dict]:
+        """执行异步分析，设置了缓存时相同局面的结果复用、并发请求只调用一次API"""
+        async def compute():
+            async with self._get_semaphore():
+                return await self._run_in_executor(analyze, game_state, language)
+
+        if self.cache is None:
+            return await compute()
+
+        key = b':'.join((self.cache.get_cache_key(game_state), kind, language.encode()))
+        if kind == b'game':
+            key += self.cache.get_history_digest(game_state)
+        return await self.cache.get_or_compute(key, compute)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """获取并发信号量 (信号量绑定事件循环，切换循环时重新创建)"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _run_in_executor(self, func, *args):
+        """在线程池中执行阻塞的HTTP调用，避免阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
     def _generate_game_description(self, game_state: GameState, language: str) -> str:
         """生成游戏描述"""
+        winner_text = self._get_winner_text(game_state.status, language)
+        duration_text = self._format_duration(game_state.get_game_duration())
+
         if language == 'zh':
-            description = f"黑白棋游戏完整复盘分析\n\n"
-            description += f"游戏结果: {self._get_winner_text(game_state.status, language)}\n"
-            description += f"最终比分: 黑子{game_state.black_count} - 白子{game_state.white_count}\n"
-            description += f"总手数: {game_state.move_count}手\n"
-            description += f"游戏时长: {self._format_duration(game_state.get_game_duration())}\n\n"
+            labels = PLAYER_LABELS_ZH
+            parts = [
+                "黑白棋游戏完整复盘分析\n\n",
+                f"游戏结果: {winner_text}\n",
+                f"最终比分: 黑子{game_state.black_count} - 白子{game_state.white_count}\n",
+                f"总手数: {game_state.move_count}手\n",
+                f"游戏时长: {duration_text}\n\n"
+            ]
 
             if game_state.moves_history:
-                description += "完整棋谱:\n"
-                for i, move in enumerate(game_state.moves_history):
-                    move_num = i + 1
-                    player = "黑" if move.player == PieceType.BLACK else "白"
-                    notation = move.to_notation()
-                    description += f"{move_num:2d}. {player}方 {notation}"
+                parts.append("完整棋谱:\n")
+                for move_num, move in enumerate(game_state.moves_history, 1):
+                    parts.append(f"{move_num:2d}. {labels[move.player]}方 {move.to_notation()}")
                     if move.flipped_count > 0:
-                        description += f" (翻转{move.flipped_count}子)"
-                    description += "\n"
+                        parts.append(f" (翻转{move.flipped_count}子)")
+                    parts.append("\n")
 
-            description += f"\n当前棋盘状态:\n{self._format_board(game_state)}"
+            parts.append("\n当前棋盘状态:\n")
         else:
-            description = f"Othello Game Complete Analysis\n\n"
-            description += f"Game Result: {self._get_winner_text(game_state.status, language)}\n"
-            description += f"Final Score: Black {game_state.black_count} - White {game_state.white_count}\n"
-            description += f"Total Moves: {game_state.move_count}\n"
-            description += f"Game Duration: {self._format_duration(game_state.get_game_duration())}\n\n"
+            labels = PLAYER_LABELS_EN
+            parts = [
+                "Othello Game Complete Analysis\n\n",
+                f"Game Result: {winner_text}\n",
+                f"Final Score: Black {game_state.black_count} - White {game_state.white_count}\n",
+                f"Total Moves: {game_state.move_count}\n",
+                f"Game Duration: {duration_text}\n\n"
+            ]
 
             if game_state.moves_history:
-                description += "Complete Game Record:\n"
-                for i, move in enumerate(game_state.moves_history):
-                    move_num = i + 1
-                    player = "Black" if move.player == PieceType.BLACK else "White"
-                    notation = move.to_notation()
-                    description += f"{move_num:2d}. {player} {notation}"
+                parts.append("Complete Game Record:\n")
+                for move_num, move in enumerate(game_state.moves_history, 1):
+                    parts.append(f"{move_num:2d}. {labels[move.player]} {move.to_notation()}")
                     if move.flipped_count > 0:
-                        description += f" (flipped {move.flipped_count})"
-                    description += "\n"
+                        parts.append(f" (flipped {move.flipped_count})")
+                    parts.append("\n")
 
-            description += f"\nFinal Board Position:\n{self._format_board(game_state)}"
+            parts.append("\nFinal Board Position:\n")
 
-        return description
+        parts.append(self._format_board(game_state))
+        return "".join(parts)
 
     def _generate_position_description(self, game_state: GameState, language: str) -> str:
         """生成局面描述"""
+        valid_move_count = len(game_state.get_valid_moves(game_state.current_player))
+        board_text = self._format_board(game_state)
+
         if language == 'zh':
-            description = f"黑白棋局面分析\n\n"
-            description += f"当前回合: {game_state.move_count}手\n"
-            description += f"轮到: {'黑方' if game_state.current_player == PieceType.BLACK else '白方'}\n"
-            description += f"当前比分: 黑子{game_state.black_count} - 白子{game_state.white_count}\n"
-            description += f"可选走法: {len(game_state.get_valid_moves(game_state.current_player))}个\n\n"
-            description += f"当前棋盘:\n{self._format_board(game_state)}\n"
-
-            # 添加最近几步走法
-            if game_state.moves_history:
-                recent_moves = game_state.moves_history[-5:]  # 最近5步
-                description += "\n最近走法:\n"
-                start_num = max(1, game_state.move_count - len(recent_moves) + 1)
-                for i, move in enumerate(recent_moves):
-                    move_num = start_num + i
-                    player = "黑" if move.player == PieceType.BLACK else "白"
-                    description += f"{move_num}. {player}方 {move.to_notation()}\n"
+            labels = PLAYER_LABELS_ZH
+            parts = [
+                "黑白棋局面分析\n\n",
+                f"当前回合: {game_state.move_count}手\n",
+                f"轮到: {labels[game_state.current_player]}方\n",
+                f"当前比分: 黑子{game_state.black_count} - 白子{game_state.white_count}\n",
+                f"可选走法: {valid_move_count}个\n\n",
+                f"当前棋盘:\n{board_text}\n"
+            ]
+            recent_title = "\n最近走法:\n"
+            move_format = "{num}. {player}方 {notation}\n"
         else:
-            description = f"Othello Position Analysis\n\n"
-            description += f"Move Number: {game_state.move_count}\n"
-            description += f"To Move: {'Black' if game_state.current_player == PieceType.BLACK else 'White'}\n"
-            description += f"Current Score: Black {game_state.black_count} - White {game_state.white_count}\n"
-            description += f"Legal Moves: {len(game_state.get_valid_moves(game_state.current_player))}\n\n"
-            description += f"Current Board:\n{self._format_board(game_state)}\n"
-
-            if game_state.moves_history:
-                recent_moves = game_state.moves_history[-5:]
-                description += "\nRecent Moves:\n"
-                start_num = max(1, game_state.move_count - len(recent_moves) + 1)
-                for i, move in enumerate(recent_moves):
-                    move_num = start_num + i
-                    player = "Black" if move.player == PieceType.BLACK else "White"
-                    description += f"{move_num}. {player} {move.to_notation()}\n"
-
-        return description
+            labels = PLAYER_LABELS_EN
+            parts = [
+                "Othello Position Analysis\n\n",
+                f"Move Number: {game_state.move_count}\n",
+                f"To Move: {labels[game_state.current_player]}\n",
+                f"Current Score: Black {game_state.black_count} - White {game_state.white_count}\n",
+                f"Legal Moves: {valid_move_count}\n\n",
+                f"Current Board:\n{board_text}\n"
+            ]
+            recent_title = "\nRecent Moves:\n"
+            move_format = "{num}. {player} {notation}\n"
+
+        # 添加最近几步走法
+        if game_state.moves_history:
+            recent_moves = game_state.moves_history[-5:]  # 最近5步
+            parts.append(recent_title)
+            start_num = max(1, game_state.move_count - len(recent_moves) + 1)
+            for move_num, move in enumerate(recent_moves, start_num):
+                parts.append(move_format.format(num=move_num, player=labels[move.player],
+                                                notation=move.to_notation()))
+
+        return "".join(parts)
 
     def _build_analysis_prompt(self, game_description: str, language: str) -> str:
         """构建完整游戏分析提示"""
-        if language == 'zh':
-            prompt = """你是一位专业的黑白棋(Othello)分析师。请对以下游戏进行深入分析:
-
-{game_description}
-
-请从以下角度进行详细分析:
-1. 开局阶段: 分析开局走法的优劣，是否符合黑白棋基本原理
-2. 中局发展: 评估中局的关键转折点，分析重要走法的得失
-3. 残局技巧: 分析残局阶段的技术要点和胜负手
-4. 整体战术: 评估双方的整体战略思路和执行效果
-5. 关键走法: 指出影响胜负的关键走法和失误
-6. 学习建议: 给出具体的改进建议和学习要点
-
-请用专业但通俗的语言进行分析，让普通玩家也能理解。分析应该具体、客观，并给出实用的建议。""".format(game_description=game_description)
-        else:
-            prompt = """You are a professional Othello/Reversi analyst. Please provide a comprehensive analysis of the following game:
-
-{game_description}
-
-Please analyze from the following perspectives:
-1. Opening Play: Evaluate the opening moves and adherence to basic Othello principles
-2. Middle Game: Assess key turning points and critical move evaluations
-3. Endgame Technique: Analyze endgame tactics and decisive moves
-4. Overall Strategy: Evaluate both players' strategic approaches and execution
-5. Key Moves: Identify game-changing moves and critical mistakes
-6. Learning Points: Provide specific improvement suggestions and study recommendations
-
-Use professional but accessible language that general players can understand. The analysis should be specific, objective, and provide practical advice.""".format(game_description=game_description)
-
-        return prompt
+        prefix, suffix = ANALYSIS_PROMPT_PARTS['zh' if language == 'zh' else 'en']
+        return prefix + game_description + suffix
 
     def _build_position_analysis_prompt(self, position_description: str, language: str) -> str:
         """构建局面分析提示"""
-        if language == 'zh':
-            prompt = """你是一位专业的黑白棋(Othello)分析师。请对以下局面进行分析:
-
-{position_description}
-
-请从以下角度分析当前局面:
-1. 局面评估: 分析当前局面的优劣形势
-2. 关键区域: 指出棋盘上的关键位置和控制要点
-3. 可选走法: 评估主要的可选走法及其后果
-4. 战术建议: 给出具体的战术建议和注意事项
-5. 风险评估: 分析可能的风险和机会
-
-请用简洁明了的语言进行分析，重点突出实用性。""".format(position_description=position_description)
-        else:
-            prompt = """You are a professional Othello/Reversi analyst. Please analyze the following position:
-
-{position_description}
-
-Please analyze the current position from these perspectives:
-1. Position Evaluation: Assess the current advantage/disadvantage
-2. Key Areas: Identify critical squares and control points on the board
-3. Move Options: Evaluate main move choices and their consequences
-4. Tactical Advice: Provide specific tactical recommendations and considerations
-5. Risk Assessment: Analyze potential risks and opportunities
-
-Use clear and concise language with focus on practical insights.""".format(position_description=position_description)
-
-        return prompt
+        prefix, suffix = POSITION_PROMPT_PARTS['zh' if language == 'zh' else 'en']
+        return prefix + position_description + suffix
 
     def _call_deepseek_api(self, prompt: str) -> Optional[str]:
         """调用DeepSeek API"""
@@ -315,25 +506,24 @@ Use clear and concise language with focus on practical insights.""".format(posit
 
         try:
             payload = {
-                'model': self.analysis_config['model'],
+                **self._payload_static,
                 'messages': [
                     {
                         'role': 'user',
                         'content': prompt
                     }
-                ],
-                'temperature': self.analysis_config['temperature'],
-                'max_tokens': self.analysis_config['max_tokens']
+                ]
             }
 
             response = self.session.post(
                 f"{self.base_url}/v1/chat/completions",
-                json=payload,
+                data=_dumps_json(payload),
+                headers=JSON_HEADERS,
                 timeout=60
             )
 
             if response.status_code == 200:
-                result = response.json()
+                result = _parse_json_response(response)
                 if 'choices' in result and len(result['choices']) > 0:
                     return result['choices'][0]['message']['content']
                 else:
@@ -350,48 +540,66 @@ Use clear and concise language with focus on practical insights.""".format(posit
             self.logger.error(f"JSON解析错误: {e}")
             return None
 
+    def _call_deepseek_api_stream(self, prompt: str) -> Iterator[str]:
+        """调用DeepSeek API (流式SSE)，逐段产出生成的文本"""
+        if not self.api_key:
+            self.logger.error("未设置DeepSeek API密钥")
+            return
+
+        payload = {
+            **self._payload_static,
+            'stream': True,
+            'messages': [
+                {
+                    'role': 'user',
+                    'content': prompt
+                }
+            ]
+        }
+
+        try:
+            with self.session.post(
+                f"{self.base_url}/v1/chat/completions",
+                data=_dumps_json(payload),
+                headers=JSON_HEADERS,
+                timeout=60,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    self.logger.error(f"API请求失败: {response.status_code} - {response.text}")
+                    return
+
+                # SSE格式: 每行 "data: {json}"，以 "data: [DONE]" 结束
+                for line in response.iter_lines():
+                    if not line.startswith(b'data:'):
+                        continue
+                    data = line[5:].strip()
+                    if data == b'[DONE]':
+                        break
+
+                    choices = _loads_json(data).get('choices')
+                    if choices:
+                        content = choices[0].get('delta', {}).get('content')
+                        if content:
+                            yield content
+
+        except requests.RequestException as e:
+            self.logger.error(f"网络请求错误: {e}")
+        except json.JSONDecodeError as e:
+            self.logger.error(f"JSON解析错误: {e}")
+
     def _format_board(self, game_state: GameState) -> str:
         """格式化棋盘显示"""
-        board_str = "   A B C D E F G H\n"
-        for row in range(8):
-            board_str += f"{row + 1}  "
-            for col in range(8):
-                piece = game_state.board[row][col]
-                if piece == PieceType.BLACK:
-                    board_str += "● "
-                elif piece == PieceType.WHITE:
-                    board_str += "○ "
-                else:
-                    board_str += "· "
-            board_str += f" {row + 1}\n"
-        board_str += "   A B C D E F G H"
-        return board_str
+        return _format_board_key(game_state.pack())
 
     def _get_winner_text(self, status: GameStatus, language: str) -> str:
         """获取胜负结果文本"""
-        if language == 'zh':
-            if status == GameStatus.BLACK_WIN:
-                return "黑方获胜"
-            elif status == GameStatus.WHITE_WIN:
-                return "白方获胜"
-            elif status == GameStatus.DRAW:
-                return "平局"
-            else:
-                return "游戏进行中"
-        else:
-            if status == GameStatus.BLACK_WIN:
-                return "Black Wins"
-            elif status == GameStatus.WHITE_WIN:
-                return "White Wins"
-            elif status == GameStatus.DRAW:
-                return "Draw"
-            else:
-                return "Game in Progress"
+        winner_texts = WINNER_TEXT_ZH if language == 'zh' else WINNER_TEXT_EN
+        return winner_texts.get(status, winner_texts[GameStatus.PLAYING])
 
     def _format_duration(self, duration: float) -> str:
         """格式化时长显示"""
-        minutes = int(duration // 60)
-        seconds = int(duration % 60)
+        minutes, seconds = divmod(int(duration), 60)
         return f"{minutes:02d}:{seconds:02d}"
 
     def test_connection(self) -> Dict:
@@ -416,38 +624,248 @@ Use clear and concise language with focus on practical insights.""".format(posit
                 'message': f'连接测试失败: {str(e)}'
             }
 
+def _consume_task_exception(task: asyncio.Task):
+    """读取已完成任务的异常，所有等待者都已取消时避免"未读取异常"告警"""
+    if not task.cancelled():
+        task.exception()
+
 class AnalysisCache:
-    """分析结果缓存"""
+    """分析结果缓存 (LRU淘汰)"""
+
+    # 缓存键前16字节为GameState.pack()的局面，其后为状态等附加信息
+    BOARD_KEY_SIZE = 16
+    # 局面之后的附加信息: 当前玩家(uint8) + 手数(uint16) + 游戏状态(uint8)
+    _KEY_SUFFIX = struct.Struct('<BHB')
+
+    def __init__(self, max_size: int = 50, similarity_threshold: Optional[float] = None,
+                 cache_file: Optional[str] = None):
+        """
+        初始化分析缓存
 
-    def __init__(self, max_size: int = 50):
-        self.cache: Dict[str, Dict] = {}
+        Args:
+            max_size: 最大缓存条目数
+            similarity_threshold: 相似局面匹配阈值 (0-1，可选)，供get_similar()使用。
+                                  get()与get_or_compute()始终只按精确键匹配
+            cache_file: 缓存持久化文件路径 (可选)，设置后启动时加载、存储后在后台写回，
+                        close()时写入尚未保存的结果
+        """
+        self.cache: "OrderedDict[bytes, Dict]" = OrderedDict()
         self.max_size = max_size
-        self.access_times: Dict[str, float] = {}
+        self.similarity_threshold = similarity_threshold
+        self.cache_file = cache_file
+        self.logger = logging.getLogger(__name__)
 
-    def get_cache_key(self, game_state: GameState) -> str:
-        """生成缓存键"""
-        moves_str = ",".join([f"{m.row}{m.col}" for m in game_state.moves_history])
-        return f"{game_state.move_count}_{moves_str}_{game_state.status.value}"
+        # 是否有尚未写回缓存文件的结果，以及正在执行的后台写回任务
+        self._dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
 
-    def get(self, key: str) -> Optional[Dict]:
-        """获取缓存结果"""
-        if key in self.cache:
-            self.access_times[key] = time.time()
-            return self.cache[key]
-        return None
+        if self.cache_file:
+            self.load_from_disk()
 
-    def put(self, key: str, analysis: Dict):
-        """存储分析结果"""
-        # 如果缓存已满，移除最久未使用的项
-        if len(self.cache) >= self.max_size:
-            oldest_key = min(self.access_times.keys(), key=lambda k: self.access_times[k])
-            del self.cache[oldest_key]
-            del self.access_times[oldest_key]
+        # 正在进行中的请求 (相同键的并发请求共享同一个任务)
+        self._inflight: Dict[bytes, asyncio.Task] = {}
+
+    def get_cache_key(self, game_state: GameState) -> bytes:
+        """生成缓存键 (16字节压缩局面 + 当前玩家 + 手数 + 游戏状态)"""
+        return game_state.pack() + self._KEY_SUFFIX.pack(
+            game_state.current_player.value, game_state.move_count & 0xFFFF,
+            game_state.status.value)
+
+    def get_history_digest(self, game_state: GameState) -> bytes:
+        """生成走法历史摘要 (完整游戏分析依赖整个走法序列，而不只是当前局面)"""
+        history = bytes(value for move in game_state.moves_history
+                        for value in ((move.row * 8 + move.col) & 0xFF, move.player.value))
+        return hashlib.blake2b(history, digest_size=8).digest()
+
+    def get(self, key: bytes) -> Optional[Dict]:
+        """获取缓存结果 (仅精确匹配)"""
+        analysis = self.cache.get(key)
+        if analysis is not None:
+            self.cache.move_to_end(key)
+        return analysis
+
+    def get_similar(self, key: bytes) -> Optional[Tuple[bytes, Dict]]:
+        """
+        按相似局面查找缓存结果 (近似匹配，需设置similarity_threshold)
 
+        精确键未命中时，返回附加信息相同、且相同格子比例不低于阈值的已缓存局面。
+        返回的分析描述的是另一个局面，一个格子的差异就可能完全改变局势评估，
+        调用方应比较返回的键与请求的键，并向用户说明该结果只是相似局面的参考。
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Tuple[bytes, Dict]: (实际匹配的缓存键, 分析结果)，未找到时返回None
+        """
+        matched_key = key if key in self.cache else None
+        if matched_key is None and self.similarity_threshold is not None:
+            matched_key = self._find_similar_key(key)
+        if matched_key is None:
+            return None
+
+        self.cache.move_to_end(matched_key)
+        return matched_key, self.cache[matched_key]
+
+    def _find_similar_key(self, key: bytes) -> Optional[bytes]:
+        """查找最相似的已缓存局面键 (相似度 = 相同格子数 / 64)"""
+        size = self.BOARD_KEY_SIZE
+        if len(key) < size:
+            return None
+
+        black_bb = int.from_bytes(key[:8], 'little')
+        white_bb = int.from_bytes(key[8:size], 'little')
+        suffix = key[size:]
+        max_diff = int((1.0 - self.similarity_threshold) * 64)
+
+        best_key = None
+        for cached_key in self.cache:
+            if cached_key[size:] != suffix or len(cached_key) < size:
+                continue
+            diff_bb = ((black_bb ^ int.from_bytes(cached_key[:8], 'little')) |
+                       (white_bb ^ int.from_bytes(cached_key[8:size], 'little')))
+            diff = bin(diff_bb).count('1')
+            if diff <= max_diff:
+                best_key, max_diff = cached_key, diff - 1
+                if diff == 0:
+                    break
+        return best_key
+
+    def put(self, key: bytes, analysis: Dict):
+        """存储分析结果"""
         self.cache[key] = analysis
-        self.access_times[key] = time.time()
+        self.cache.move_to_end(key)
+
+        # 超出容量时移除最久未使用的项
+        if len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+
+        if self.cache_file:
+            # 只标记待写回，由后台写回任务或close()写入磁盘，避免每次存储都阻塞调用方
+            self._dirty = True
+
+    async def get_or_compute(self, key: bytes, compute: Callable) -> Optional[Dict]:
+        """
+        获取缓存结果，未命中时执行compute并缓存成功的结果
+
+        同一键的并发请求只会执行一次compute，其余请求等待并共享该结果
+
+        Args:
+            key: 缓存键
+            compute: 无参协程函数，返回分析结果字典
+
+        Returns:
+            Dict: 分析结果
+        """
+        analysis = self.get(key)
+        if analysis is not None:
+            return analysis
+
+        # compute由缓存持有的任务执行，所有请求 (包括第一个) 都通过shield等待，
+        # 某个请求被取消时不会取消任务，也不会影响其他等待者
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._compute_and_store(key, compute))
+            task.add_done_callback(_consume_task_exception)
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _compute_and_store(self, key: bytes, compute: Callable) -> Optional[Dict]:
+        """执行compute并缓存成功的结果 (由get_or_compute创建的任务调用)"""
+        try:
+            analysis = await compute()
+        finally:
+            self._inflight.pop(key, None)
+
+        if analysis and analysis.get('success'):
+            self.put(key, analysis)
+            if self._dirty:
+                self._schedule_flush()
+        return analysis
+
+    def _schedule_flush(self):
+        """启动后台写回任务 (已有任务在运行时由它继续写入最新内容)"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_in_background())
+
+    async def _flush_in_background(self):
+        """在线程池中写回缓存文件，JSON序列化和fsync不阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        while self._dirty:
+            # 快照在事件循环线程中生成，线程池只负责写文件，写入期间有新结果时再写一次
+            self._dirty = False
+            data = self._snapshot()
+            if not await loop.run_in_executor(None, self._write_snapshot, data):
+                self._dirty = True  # 写入失败，留待下次存储或close()时重试
+                break
+
+    def load_from_disk(self) -> bool:
+        """
+        从缓存文件加载分析结果
+
+        Returns:
+            bool: 是否加载成功 (文件不存在视为成功)
+        """
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return True
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            # 文件中按最久未使用到最近使用的顺序保存
+            self.cache.clear()
+            for entry in data.get('entries', [])[-self.max_size:]:
+                self.cache[bytes.fromhex(entry['key'])] = entry['analysis']
+
+            self.logger.info(f"已加载 {len(self.cache)} 条分析缓存")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"加载分析缓存失败: {e}")
+            return False
+
+    def flush_to_disk(self) -> bool:
+        """
+        将分析结果原子写入缓存文件
+
+        Returns:
+            bool: 是否保存成功
+        """
+        if not self.cache_file:
+            return False
+
+        self._dirty = False
+        if self._write_snapshot(self._snapshot()):
+            return True
+        self._dirty = True
+        return False
+
+    def _snapshot(self) -> Dict:
+        """生成缓存文件内容 (按最久未使用到最近使用的顺序)"""
+        return {
+            'version': '1.0',
+            'entries': [{'key': key.hex(), 'analysis': analysis}
+                        for key, analysis in self.cache.items()]
+        }
+
+    def _write_snapshot(self, data: Dict) -> bool:
+        """原子写入缓存文件内容"""
+        try:
+            atomic_write_json(self.cache_file, data)
+            return True
+
+        except Exception as e:
+            self.logger.error(f"保存分析缓存失败: {e}")
+            return False
 
     def clear(self):
         """清空缓存"""
         self.cache.clear()
-        self.access_times.clear()
\ No newline at end of file
+        if self.cache_file:
+            self.flush_to_disk()
+
+    def close(self):
+        """写入尚未保存的分析结果 (程序退出前调用)"""
+        if self._dirty:
+            self.flush_to_disk()
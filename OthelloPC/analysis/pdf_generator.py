@@ -10,25 +10,48 @@ PDF报告生成器
 """
 
 import os
+import re
+from itertools import zip_longest
 from datetime import datetime
-from typing import List, Optional
+from types import MappingProxyType
+from typing import List, Mapping, Optional
 import logging
 
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import cm
 from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, LongTable, TableStyle, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 
-from game.game_state import GameState, Move, PieceType, GameStatus
+from game.game_state import GameState, Move, GameStatus, unpack_board_values
+
+# 棋盘图示 (棋子符号按PieceType.value索引: EMPTY/BLACK/WHITE)
+BOARD_GLYPHS = ('·', '●', '○')
+BOARD_HEADER_ROW = ('',) + tuple('ABCDEFGH')
+
+# 游戏状态显示文本 (只读)
+STATUS_TEXT_ZH: Mapping[GameStatus, str] = MappingProxyType({
+    GameStatus.PLAYING: "进行中",
+    GameStatus.BLACK_WIN: "黑方获胜",
+    GameStatus.WHITE_WIN: "白方获胜",
+    GameStatus.DRAW: "平局",
+    GameStatus.NOT_STARTED: "未开始"
+})
+
+# 分析文本段落分隔 (连续空行视为一个分隔)
+PARAGRAPH_SEPARATOR = re.compile(r'\n\n+')
 
 
 class PDFReportGenerator:
     """PDF报告生成器"""
 
+    # 字体注册与样式表在所有实例间共享 (只需初始化一次)
+    _fonts_registered = False
+    _styles_cache = None
+
     def __init__(self, output_path: str):
         """
         初始化PDF生成器
@@ -51,9 +74,18 @@ class PDFReportGenerator:
         # 创建样式
         self.styles = self._create_styles()
 
-    def _register_chinese_fonts(self):
-        """注册中文字体"""
+    @classmethod
+    def _register_chinese_fonts(cls):
+        """注册中文字体 (仅首次调用时探测并解析字体文件)"""
+        if cls._fonts_registered:
+            return
+        cls._fonts_registered = True
+
+        logger = logging.getLogger(__name__)
         try:
+            if 'ChineseFont' in pdfmetrics.getRegisteredFontNames():
+                return
+
             # Windows系统字体路径
             font_paths = [
                 'C:/Windows/Fonts/msyh.ttc',      # 微软雅黑
@@ -62,23 +94,27 @@ class PDFReportGenerator:
             ]
 
             for font_path in font_paths:
-                if os.path.exists(font_path):
+                if os.path.isfile(font_path):
                     try:
                         pdfmetrics.registerFont(TTFont('ChineseFont', font_path))
-                        self.logger.info(f"成功注册中文字体: {font_path}")
+                        logger.info(f"成功注册中文字体: {font_path}")
                         return
                     except Exception as e:
-                        self.logger.warning(f"注册字体失败 {font_path}: {e}")
+                        logger.warning(f"注册字体失败 {font_path}: {e}")
                         continue
 
             # 如果所有字体都失败，使用默认字体
-            self.logger.warning("未找到中文字体，将使用默认字体（可能无法显示中文）")
+            logger.warning("未找到中文字体，将使用默认字体（可能无法显示中文）")
 
         except Exception as e:
-            self.logger.error(f"注册中文字体时发生错误: {e}")
+            logger.error(f"注册中文字体时发生错误: {e}")
+
+    @classmethod
+    def _create_styles(cls):
+        """创建文档样式 (样式表只读，创建后缓存复用)"""
+        if cls._styles_cache is not None:
+            return cls._styles_cache
 
-    def _create_styles(self):
-        """创建文档样式"""
         styles = getSampleStyleSheet()
 
         # 标题样式
@@ -123,6 +159,7 @@ class PDFReportGenerator:
             textColor=colors.HexColor('#666666')
         ))
 
+        cls._styles_cache = styles
         return styles
 
     def add_header(self, title: str, subtitle: str = ""):
@@ -161,19 +198,10 @@ class PDFReportGenerator:
         self.story.append(heading)
 
         # 游戏状态
-        status_map = {
-            GameStatus.PLAYING: "进行中",
-            GameStatus.BLACK_WIN: "黑方获胜",
-            GameStatus.WHITE_WIN: "白方获胜",
-            GameStatus.DRAW: "平局",
-            GameStatus.NOT_STARTED: "未开始"
-        }
-        status_text = status_map.get(game_state.status, "未知")
+        status_text = STATUS_TEXT_ZH.get(game_state.status, "未知")
 
         # 游戏时长
-        duration = game_state.get_game_duration()
-        minutes = int(duration // 60)
-        seconds = int(duration % 60)
+        minutes, seconds = divmod(int(game_state.get_game_duration()), 60)
         duration_text = f"{minutes:02d}:{seconds:02d}"
 
         # 创建信息表格
@@ -211,25 +239,10 @@ class PDFReportGenerator:
         heading = Paragraph("最终棋盘", self.styles['ChineseHeading'])
         self.story.append(heading)
 
-        # 创建棋盘表格数据
-        board_data = []
-
-        # 列标题行
-        header_row = [''] + [chr(ord('A') + i) for i in range(8)]
-        board_data.append(header_row)
-
-        # 棋盘行
-        for row in range(8):
-            row_data = [str(row + 1)]
-            for col in range(8):
-                piece = game_state.board[row][col]
-                if piece == PieceType.BLACK:
-                    row_data.append('●')
-                elif piece == PieceType.WHITE:
-                    row_data.append('○')
-                else:
-                    row_data.append('·')
-            board_data.append(row_data)
+        # 创建棋盘表格数据 (列标题行 + 8行棋盘，棋子通过查表转换为符号)
+        board_data = [list(BOARD_HEADER_ROW)]
+        for row_num, values in enumerate(unpack_board_values(game_state.pack()), 1):
+            board_data.append([str(row_num)] + [BOARD_GLYPHS[value] for value in values])
 
         # 创建表格
         cell_size = 1.5*cm
@@ -262,15 +275,13 @@ class PDFReportGenerator:
         heading = Paragraph("DeepSeek AI 分析报告", self.styles['ChineseHeading'])
         self.story.append(heading)
 
-        # 分析内容（按段落分割）
-        paragraphs = analysis.split('\n\n')
-        for para_text in paragraphs:
+        # 分析内容（按段落分割，替换换行符为<br/>标签）
+        for para_text in PARAGRAPH_SEPARATOR.split(analysis):
             if para_text.strip():
-                # 替换换行符为<br/>标签
-                para_text = para_text.replace('\n', '<br/>')
-                para = Paragraph(para_text, self.styles['ChineseBody'])
-                self.story.append(para)
-                self.story.append(Spacer(1, 0.3*cm))
+                self.story.extend((
+                    Paragraph(para_text.replace('\n', '<br/>'), self.styles['ChineseBody']),
+                    Spacer(1, 0.3*cm)
+                ))
 
     def add_pgn_moves(self, moves: List[Move]):
         """
@@ -287,17 +298,14 @@ class PDFReportGenerator:
         self.story.append(heading)
 
         # 创建棋谱表格
-        data = []
-        data.append(['手数', '黑方', '白方'])
-
-        for i in range(0, len(moves), 2):
-            move_num = i // 2 + 1
-            black_move = moves[i].to_notation()
-            white_move = moves[i + 1].to_notation() if i + 1 < len(moves) else ''
-            data.append([str(move_num), black_move, white_move])
-
-        # 创建表格
-        table = Table(data, colWidths=[2*cm, 5*cm, 5*cm])
+        data = [['手数', '黑方', '白方']]
+        data.extend(
+            [str(move_num), black_move.to_notation(), white_move.to_notation() if white_move else '']
+            for move_num, (black_move, white_move) in enumerate(zip_longest(moves[0::2], moves[1::2]), 1)
+        )
+
+        # 创建表格 (LongTable跨页时按需拆分，并在每页重复表头)
+        table = LongTable(data, colWidths=[2*cm, 5*cm, 5*cm], repeatRows=1)
         table.setStyle(TableStyle([
             ('FONTNAME', (0, 0), (-1, -1), 'ChineseFont'),
             ('FONTSIZE', (0, 0), (-1, -1), 10),
@@ -15,9 +15,13 @@ import threading
 import time
 import struct
 from typing import Optional, Callable, List, Dict
-from queue import Queue, Empty
+from collections import deque
 import logging
 
+# 数据包包头 (STX, CMD, LEN) 与包尾 (CHECKSUM, ETX) 布局
+PACKET_HEAD_STRUCT = struct.Struct('BBB')
+PACKET_TAIL_STRUCT = struct.Struct('BB')
+
 class SerialProtocol:
     """串口协议定义"""
 
@@ -63,32 +67,40 @@ class SerialProtocol:
     def calculate_checksum(command: int, length: int, data: bytes) -> int:
         """计算校验和 (XOR算法)"""
         checksum = command ^ length
-        for byte in data:
-            checksum ^= byte
-        return checksum
+        if not data:
+            return checksum
+        if len(data) < 32:
+            for byte in data:
+                checksum ^= byte
+            return checksum
+
+        # 将数据视为一个整数，按2的幂次宽度反复将高半部分异或到低半部分，
+        # 最低字节即为所有字节的异或 (高位残留不影响低位结果)
+        acc = int.from_bytes(data, 'little')
+        shift = 4 << (len(data) - 1).bit_length()
+        while shift >= 8:
+            acc ^= acc >> shift
+            shift >>= 1
+        return checksum ^ (acc & 0xFF)
 
     @staticmethod
     def create_packet(command: int, data: bytes = b'') -> bytes:
         """创建数据包 (格式: STX + CMD + LEN + DATA + CHECKSUM + ETX)"""
-        if len(data) > SerialProtocol.MAX_DATA_LENGTH:
+        length = len(data)
+        if length > SerialProtocol.MAX_DATA_LENGTH:
             raise ValueError("数据长度超出限制")
 
-        packet = bytearray()
-        packet.append(SerialProtocol.PACKET_HEADER)  # STX
-        packet.append(command)
-        packet.append(len(data))
-        packet.extend(data)
-
-        # 计算校验和 (XOR: CMD ^ LEN ^ DATA[0] ^ DATA[1] ^ ...)
-        checksum = SerialProtocol.calculate_checksum(command, len(data), data)
-        packet.append(checksum)
-        packet.append(SerialProtocol.PACKET_FOOTER)  # ETX
+        # 计算校验和 (XOR: CMD ^ LEN ^ DATA[0] ^ DATA[1] ^ ...)，数据只遍历这一次
+        checksum = SerialProtocol.calculate_checksum(command, length, data)
 
-        return bytes(packet)
+        # 包头(STX+CMD+LEN)与包尾(CHECKSUM+ETX)各打包一次，与数据拼接成最终的bytes
+        return (PACKET_HEAD_STRUCT.pack(SerialProtocol.PACKET_HEADER, command, length)
+                + data
+                + PACKET_TAIL_STRUCT.pack(checksum, SerialProtocol.PACKET_FOOTER))
 
     @staticmethod
     def parse_packet(data: bytes) -> Optional[tuple]:
-        """解析数据包，返回(command, data)或None"""
+        """解析数据包 (可传入bytes/bytearray/memoryview)，返回(command, data)或None"""
         if len(data) < 5:  # 最小包长度
             return None
 
@@ -109,11 +121,63 @@ class SerialProtocol:
         if checksum != calculated_checksum:
             return None
 
-        return command, packet_data
+        # 校验通过后才转为bytes (传入memoryview时切片不复制，仅在此处复制一次)
+        return command, bytes(packet_data)
+
+# 命令名称 (用于日志)
+COMMAND_NAMES = {
+    0x01: 'BOARD_STATE', 0x02: 'MAKE_MOVE', 0x03: 'GAME_CONFIG',
+    0x04: 'GAME_STATS', 0x05: 'SYSTEM_INFO', 0x06: 'AI_REQUEST',
+    0x07: 'HEARTBEAT', 0x08: 'ACK', 0x09: 'DEBUG_INFO',
+    0x0A: 'KEY_EVENT', 0x0B: 'LED_CONTROL', 0x0C: 'GAME_CONTROL',
+    0x0D: 'MODE_SELECT', 0x0E: 'SCORE_UPDATE', 0x0F: 'TIMER_UPDATE',
+    0xFF: 'ERROR'
+}
+
+# 无数据负载的命令包内容固定，预先构建以免每次发送重复打包
+ZERO_PAYLOAD_PACKETS = {
+    command: SerialProtocol.create_packet(command)
+    for command in (SerialProtocol.CMD_HEARTBEAT,
+                    SerialProtocol.CMD_GAME_CONFIG,
+                    SerialProtocol.CMD_SYSTEM_INFO)
+}
+
+# 各命令数据负载的结构体布局 (预编译格式串，须与STM32端C结构体一致)
+MAKE_MOVE_STRUCT = struct.Struct('<BBBxI')     # row, col, player, padding[1], timestamp
+AI_REQUEST_STRUCT = struct.Struct('B')         # difficulty
+GAME_CONTROL_STRUCT = struct.Struct('<BxxxI')  # action, padding[3], timestamp
+MODE_SELECT_STRUCT = struct.Struct('<BH')      # mode, time_limit
+CHEAT_TOGGLE_STRUCT = struct.Struct('<BB')     # enable, selected_color
+SCORE_UPDATE_STRUCT = struct.Struct('<BBHB')   # black, white, total, result
+TIMER_UPDATE_STRUCT = struct.Struct('<HB')     # remaining_time, timer_state
+GAME_STATE_STRUCT = struct.Struct('<64sBBBBI')  # Game_State_Data_t: board[64], player, black, white, game_over, move_count
+
+# STM32设备串口的常见标识 (已转为大写，用于自动检测端口)
+STM32_PORT_INDICATORS = tuple(indicator.upper() for indicator in (
+    'STM32',
+    'STMicroelectronics',
+    'Virtual COM Port',
+    'USB Serial',
+    'CH340',
+    'CP210'
+))
+
+_monotonic_ns = time.monotonic_ns
+
+def _timestamp_ms() -> int:
+    """命令时间戳: 毫秒级单调时钟截断为uint32 (STM32端仅作相对时间使用)"""
+    return (_monotonic_ns() // 1000000) & 0xFFFFFFFF
 
 class SerialHandler:
     """STM32串口通信处理器"""
 
+    # 单次合并写入的字节上限 (限制合并带来的发送延迟)
+    SEND_BATCH_LIMIT = 4096
+    # 接收缓冲已读部分超过该字节数时压缩缓冲区
+    RX_COMPACT_THRESHOLD = 4096
+    # 接收缓冲区常驻大小上限，超过后在解析结束时收缩并记录日志
+    RX_BUFFER_SOFT_MAX = 65536
+
     def __init__(self, callback: Optional[Callable] = None, config=None):
         """
         初始化串口处理器
@@ -133,11 +197,21 @@ class SerialHandler:
         # 线程控制
         self.running = False
         self.receive_thread: Optional[threading.Thread] = None
-        self.send_queue = Queue()
+        # 发送队列: 多个生产者append，仅发送线程popleft (deque的两端操作是线程安全的)
+        self.send_queue = deque()
+        self._send_event = threading.Event()
+        self._write_lock = threading.Lock()  # 串口写操作互斥 (发送线程与直接发送)
         self.send_thread: Optional[threading.Thread] = None
-
-        # 数据缓冲
+        # 已解析数据包队列: 接收线程只负责读串口和解析，回调在分发线程中按接收顺序执行
+        # (队列、唤醒事件与停止标志在每次连接时重新创建，归该连接的分发线程独有)
+        self._rx_done = deque()
+        self._rx_event = threading.Event()
+        self._dispatch_stop = threading.Event()
+        self.dispatch_thread: Optional[threading.Thread] = None
+
+        # 数据缓冲 (_rx_head为未解析数据的起始位置)
         self.receive_buffer = bytearray()
+        self._rx_head = 0
         self.packet_buffer = []
 
         # 状态监控
@@ -214,13 +288,25 @@ class SerialHandler:
             self.serial_port.reset_input_buffer()
             self.serial_port.reset_output_buffer()
 
+            # 新连接使用新的接收缓冲与分发队列，上一连接遗留的数据不会在重连后分发
+            self.receive_buffer.clear()
+            self._rx_head = 0
+            self._rx_done = deque()
+            self._rx_event = threading.Event()
+            self._dispatch_stop = threading.Event()
+
             # 启动通信线程
             self.running = True
             self.receive_thread = threading.Thread(target=self._receive_worker, daemon=True)
             self.send_thread = threading.Thread(target=self._send_worker, daemon=True)
+            self.dispatch_thread = threading.Thread(
+                target=self._dispatch_worker,
+                args=(self._rx_done, self._rx_event, self._dispatch_stop),
+                daemon=True)
 
             self.receive_thread.start()
             self.send_thread.start()
+            self.dispatch_thread.start()
 
             self.connection_status = True
             self.stats['reconnect_count'] += 1
@@ -241,6 +327,7 @@ class SerialHandler:
         try:
             self.running = False
             self.connection_status = False
+            self._send_event.set()  # 唤醒发送线程以便及时退出
 
             # 等待线程结束
             if self.receive_thread and self.receive_thread.is_alive():
@@ -249,8 +336,19 @@ class SerialHandler:
             if self.send_thread and self.send_thread.is_alive():
                 self.send_thread.join(timeout=2.0)
 
-            # 关闭串口
+            # 接收线程结束后通知分发线程，处理完剩余数据包后退出
+            self._dispatch_stop.set()
+            self._rx_event.set()
+            if self.dispatch_thread and self.dispatch_thread.is_alive():
+                self.dispatch_thread.join(timeout=2.0)
+                if self.dispatch_thread.is_alive():
+                    # 回调耗时过长: 丢弃剩余数据包，分发线程完成当前回调后即退出
+                    self.logger.warning(f"分发线程未及时结束，丢弃 {len(self._rx_done)} 个未处理的数据包")
+                    self._rx_done.clear()
+
+            # 关闭串口 (先等待已写入的数据发送完毕)
             if self.serial_port and self.serial_port.is_open:
+                self.serial_port.flush()
                 self.serial_port.close()
                 self.serial_port = None
 
@@ -278,28 +376,59 @@ class SerialHandler:
             bool: 发送是否成功
         """
         try:
-            packet = SerialProtocol.create_packet(command, data)
+            packet = self._build_packet(command, data)
+            self.send_queue.append(packet)
+            self._send_event.set()
+            return True
+        except Exception as e:
+            self.logger.error(f"发送命令失败: {e}")
+            return False
+
+    def send_command_direct(self, command: int, data: bytes = b'') -> bool:
+        """
+        在调用线程中直接写出命令 (用于低频控制命令，省去与发送线程的交接)
+
+        发送队列中仍有待发数据包或串口未打开时改为入队，保证发送顺序不变
 
-            # 详细日志 - 命令名称映射
-            cmd_name = {
-                0x01: 'BOARD_STATE', 0x02: 'MAKE_MOVE', 0x03: 'GAME_CONFIG',
-                0x04: 'GAME_STATS', 0x05: 'SYSTEM_INFO', 0x06: 'AI_REQUEST',
-                0x07: 'HEARTBEAT', 0x08: 'ACK', 0x09: 'DEBUG_INFO',
-                0x0A: 'KEY_EVENT', 0x0B: 'LED_CONTROL', 0x0C: 'GAME_CONTROL',
-                0x0D: 'MODE_SELECT', 0x0E: 'SCORE_UPDATE', 0x0F: 'TIMER_UPDATE',
-                0xFF: 'ERROR'
-            }.get(command, f'UNKNOWN({command:02X})')
-
-            self.logger.info(f"📤 发送命令: {cmd_name} (0x{command:02X}), 数据长度: {len(data)}")
-            if len(data) > 0 and len(data) <= 16:
-                self.logger.debug(f"   数据内容: {data.hex(' ')}")
-
-            self.send_queue.put(packet, timeout=1.0)
+        Args:
+            command: 命令代码
+            data: 数据内容
+
+        Returns:
+            bool: 发送是否成功
+        """
+        try:
+            packet = self._build_packet(command, data)
+            with self._write_lock:
+                port = self.serial_port
+                if self.send_queue or not (port and port.is_open):
+                    self.send_queue.append(packet)
+                    self._send_event.set()
+                    return True
+
+                port.write(packet)  # 不调用flush()，避免调用线程阻塞到数据发完
+                self.stats['packets_sent'] += 1
             return True
         except Exception as e:
             self.logger.error(f"发送命令失败: {e}")
+            self.stats['errors'] += 1
             return False
 
+    def _build_packet(self, command: int, data: bytes) -> bytes:
+        """构建待发送的数据包并记录日志"""
+        packet = None if data else ZERO_PAYLOAD_PACKETS.get(command)
+        if packet is None:
+            packet = SerialProtocol.create_packet(command, data)
+
+        # 详细日志 - 命令名称映射 (日志级别未启用时跳过)
+        if self.logger.isEnabledFor(logging.INFO):
+            cmd_name = COMMAND_NAMES.get(command) or f'UNKNOWN({command:02X})'
+            self.logger.info("📤 发送命令: %s (0x%02X), 数据长度: %d", cmd_name, command, len(data))
+            if 0 < len(data) <= 16 and self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("   数据内容: %s", data.hex(' '))
+
+        return packet
+
     def send_board_state(self, board_data: bytes) -> bool:
         """发送棋盘状态"""
         if len(board_data) != 64:
@@ -309,10 +438,10 @@ class SerialHandler:
 
     def send_make_move(self, row: int, col: int, player: int) -> bool:
         """发送走棋命令"""
-        timestamp = int(time.time() * 1000) & 0xFFFFFFFF  # 毫秒级时间戳，4字节
+        timestamp = _timestamp_ms()  # 毫秒级时间戳，4字节
         # 使用BBBxI格式确保8字节对齐（x表示1字节padding）
         # 对应C结构体: uint8_t[3] + padding[1] + uint32_t[4] = 8字节
-        data = struct.pack('<BBBxI', row, col, player, timestamp)
+        data = MAKE_MOVE_STRUCT.pack(row, col, player, timestamp)
         return self.send_command(SerialProtocol.CMD_MAKE_MOVE, data)
 
     def send_new_game(self) -> bool:
@@ -321,12 +450,12 @@ class SerialHandler:
 
     def send_ai_request(self, difficulty: int = 1) -> bool:
         """请求AI走法"""
-        data = struct.pack('B', difficulty)
+        data = AI_REQUEST_STRUCT.pack(difficulty)
         return self.send_command(SerialProtocol.CMD_AI_REQUEST, data)
 
     def send_heartbeat(self) -> bool:
-        """发送心跳包"""
-        current_time = time.time()
+        """发送心跳包 (连接后发送线程会按heartbeat_interval自动发送，无需定时调用)"""
+        current_time = time.monotonic()  # 间隔判断使用单调时钟，不受系统时间调整影响
         if current_time - self.last_heartbeat >= self.heartbeat_interval:
             self.last_heartbeat = current_time
             return self.send_command(SerialProtocol.CMD_HEARTBEAT)
@@ -346,11 +475,11 @@ class SerialHandler:
         Returns:
             bool: 发送是否成功
         """
-        timestamp = int(time.time() * 1000) & 0xFFFFFFFF
+        timestamp = _timestamp_ms()
         # 使用BxxxI格式确保8字节对齐（xxx表示3字节padding）
         # 对应C结构体: uint8_t + padding[3] + uint32_t[4] = 8字节
-        data = struct.pack('<BxxxI', action, timestamp)
-        return self.send_command(SerialProtocol.CMD_GAME_CONTROL, data)
+        data = GAME_CONTROL_STRUCT.pack(action, timestamp)
+        return self.send_command_direct(SerialProtocol.CMD_GAME_CONTROL, data)
 
     def send_game_start(self) -> bool:
         """发送开始游戏命令"""
@@ -389,8 +518,8 @@ class SerialHandler:
             self.logger.error("GAME_MODE_CHEAT is deprecated. Use send_cheat_toggle() instead.")
             return False
 
-        data = struct.pack('<BH', mode, time_limit)
-        return self.send_command(SerialProtocol.CMD_MODE_SELECT, data)
+        data = MODE_SELECT_STRUCT.pack(mode, time_limit)
+        return self.send_command_direct(SerialProtocol.CMD_MODE_SELECT, data)
 
     def send_cheat_toggle(self, enable: bool, selected_color: int = 1) -> bool:
         """
@@ -424,7 +553,7 @@ class SerialHandler:
             # 确保颜色值为有效的uint8_t
             color_byte = int(selected_color) & 0xFF
 
-            data = struct.pack('<BB', enable_byte, color_byte)
+            data = CHEAT_TOGGLE_STRUCT.pack(enable_byte, color_byte)
 
             # 详细日志
             state_name = "ENABLED" if enable else "DISABLED"
@@ -479,7 +608,7 @@ class SerialHandler:
         Returns:
             bool: 发送是否成功
         """
-        data = struct.pack('<BBHB', black_score, white_score, total_score, game_result)
+        data = SCORE_UPDATE_STRUCT.pack(black_score, white_score, total_score, game_result)
         return self.send_command(SerialProtocol.CMD_SCORE_UPDATE, data)
 
     def send_timer_update(self, remaining_time: int, timer_state: int) -> bool:
@@ -493,7 +622,7 @@ class SerialHandler:
         Returns:
             bool: 发送是否成功
         """
-        data = struct.pack('<HB', remaining_time, timer_state)
+        data = TIMER_UPDATE_STRUCT.pack(remaining_time, timer_state)
         return self.send_command(SerialProtocol.CMD_TIMER_UPDATE, data)
 
     def send_full_game_state(self, game_state) -> bool:
@@ -506,33 +635,21 @@ class SerialHandler:
             bool: 发送是否成功
         """
         try:
-            # 构建72字节数据包
-            data = bytearray(72)
-
-            # 1. 棋盘数据 (0-63字节)
-            for row in range(8):
-                for col in range(8):
-                    idx = row * 8 + col
-                    data[idx] = game_state.board[row][col].value
-
-            # 2. 当前玩家 (64字节)
-            data[64] = game_state.current_player.value
-
-            # 3. 棋子计数 (65-66字节)
-            data[65] = game_state.black_count
-            data[66] = game_state.white_count
-
-            # 4. 游戏结束标志 (67字节)
-            data[67] = 1 if game_state.status.value != 0 else 0
-
-            # 5. 走法计数 (68-71字节, little-endian)
-            struct.pack_into('<I', data, 68, game_state.move_count)
+            # 构建72字节数据包 (一次打包全部字段)
+            data = GAME_STATE_STRUCT.pack(
+                game_state.board_bytes(),                  # 1. 棋盘数据 (0-63字节)
+                game_state.current_player.value,           # 2. 当前玩家 (64字节)
+                game_state.black_count,                    # 3. 棋子计数 (65-66字节)
+                game_state.white_count,
+                1 if game_state.status.value != 0 else 0,  # 4. 游戏结束标志 (67字节)
+                game_state.move_count                      # 5. 走法计数 (68-71字节, little-endian)
+            )
 
             self.logger.info(f"发送完整游戏状态: 玩家={game_state.current_player.name}, "
                             f"黑={game_state.black_count}, 白={game_state.white_count}")
 
             # 发送数据（使用CMD_BOARD_STATE命令）
-            return self.send_command(SerialProtocol.CMD_BOARD_STATE, bytes(data))
+            return self.send_command(SerialProtocol.CMD_BOARD_STATE, data)
 
         except Exception as e:
             self.logger.error(f"构建游戏状态数据失败: {e}")
@@ -542,24 +659,12 @@ class SerialHandler:
         """自动检测STM32设备端口"""
         ports = self.get_available_ports()
 
-        # STM32设备的常见标识
-        stm32_indicators = [
-            'STM32',
-            'STMicroelectronics',
-            'Virtual COM Port',
-            'USB Serial',
-            'CH340',
-            'CP210'
-        ]
-
         for port_info in ports:
-            description = port_info['description'].upper()
-            hwid = port_info['hwid'].upper()
-
-            for indicator in stm32_indicators:
-                if indicator.upper() in description or indicator.upper() in hwid:
-                    self.logger.info(f"检测到STM32设备: {port_info['device']} - {port_info['description']}")
-                    return port_info['device']
+            # 描述与硬件ID合并后统一转大写一次 (用换行分隔，避免标识跨越两个字段匹配)
+            port_text = f"{port_info['description']}\n{port_info['hwid']}".upper()
+            if any(indicator in port_text for indicator in STM32_PORT_INDICATORS):
+                self.logger.info(f"检测到STM32设备: {port_info['device']} - {port_info['description']}")
+                return port_info['device']
 
         # 如果没有找到特定标识，返回第一个可用端口
         if ports:
@@ -571,19 +676,25 @@ class SerialHandler:
     def _receive_worker(self):
         """接收数据工作线程"""
         self.logger.info("串口接收线程已启动")
+        # 循环内反复使用的方法提前绑定为局部变量 (接收缓冲区对象在整个生命周期内不变)
+        extend = self.receive_buffer.extend
+        parse = self._parse_received_data
+        is_enabled_for = self.logger.isEnabledFor
+        log_debug = self.logger.debug
         while self.running:
             try:
-                if self.serial_port and self.serial_port.is_open:
-                    # 读取数据
-                    if self.serial_port.in_waiting > 0:
-                        data = self.serial_port.read(self.serial_port.in_waiting)
-                        self.logger.debug(f"接收到原始数据 ({len(data)}字节): {data.hex(' ')}")
-                        self.receive_buffer.extend(data)
+                port = self.serial_port  # 每轮取一次，重连后自动使用新的串口对象
+                if port and port.is_open:
+                    # 读取数据: 无数据时在驱动中阻塞等待首个字节 (最长为串口超时时间)，
+                    # 有数据时一次读出全部已到达的字节，不再定时轮询
+                    data = port.read(port.in_waiting or 1)
+                    if data:
+                        if is_enabled_for(logging.DEBUG):
+                            log_debug("接收到原始数据 (%d字节): %s", len(data), data.hex(' '))
+                        extend(data)
 
                         # 解析数据包
-                        self._parse_received_data()
-
-                    time.sleep(0.01)  # 10ms轮询间隔
+                        parse()
                 else:
                     time.sleep(0.1)
 
@@ -595,89 +706,169 @@ class SerialHandler:
         self.logger.info("串口接收线程已停止")
 
     def _send_worker(self):
-        """发送数据工作线程"""
+        """发送数据工作线程 (将队列中积压的数据包合并为一次写入，并按间隔自动发送心跳)"""
+        send_queue = self.send_queue
+        popleft = send_queue.popleft
+        monotonic = time.monotonic
         while self.running:
             try:
-                # 从队列获取数据包
-                packet = self.send_queue.get(timeout=1.0)
-
-                if self.serial_port and self.serial_port.is_open:
-                    # 添加详细的十六进制日志
-                    self.logger.debug(f"发送数据包 ({len(packet)}字节): {packet.hex(' ')}")
-
-                    self.serial_port.write(packet)
-                    self.serial_port.flush()
-                    self.stats['packets_sent'] += 1
-
-                    # 发送成功日志
-                    cmd_byte = packet[1] if len(packet) > 1 else 0
-                    len_byte = packet[2] if len(packet) > 2 else 0
-                    self.logger.info(f"✅ 发送成功 - 命令: 0x{cmd_byte:02X}, 数据长度: {len_byte}")
-                else:
-                    self.logger.warning("串口未连接，丢弃数据包")
+                # 心跳到期时加入发送队列，与其他积压数据包一起写出
+                heartbeat_wait = self.last_heartbeat + self.heartbeat_interval - monotonic()
+                if heartbeat_wait <= 0:
+                    self.last_heartbeat = monotonic()
+                    send_queue.append(ZERO_PAYLOAD_PACKETS[SerialProtocol.CMD_HEARTBEAT])
+                    self.logger.debug("📤 发送心跳包")
+
+                # 队列为空时等待新数据包 (最长等到下一次心跳到期)
+                if not send_queue:
+                    self._send_event.wait(timeout=min(1.0, heartbeat_wait))
+                    self._send_event.clear()
+                    if not send_queue:
+                        continue
+
+                # 取出与写出在同一把锁内完成，避免与直接发送的数据包交错
+                with self._write_lock:
+                    # 取出已积压的数据包，合并到同一个写缓冲
+                    batch = bytearray()
+                    packet_count = 0
+                    while send_queue and len(batch) < self.SEND_BATCH_LIMIT:
+                        batch.extend(popleft())
+                        packet_count += 1
+
+                    port = self.serial_port
+                    if port and port.is_open:
+                        # 添加详细的十六进制日志 (仅在DEBUG级别启用时格式化)
+                        debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+                        if debug_enabled:
+                            self.logger.debug("发送数据 (%d个数据包, %d字节): %s",
+                                              packet_count, len(batch), batch.hex(' '))
+
+                        port.write(batch)
+                        # 仅在队列已清空时等待数据发出，积压数据继续合并写入而不逐包阻塞
+                        if not send_queue:
+                            port.flush()
+                        self.stats['packets_sent'] += packet_count
+
+                        # 发送成功日志 (每批一次，降为DEBUG级别)
+                        if debug_enabled:
+                            self.logger.debug("✅ 发送成功 - 数据包: %d个, 总长度: %d字节", packet_count, len(batch))
+                    else:
+                        self.logger.warning(f"串口未连接，丢弃 {packet_count} 个数据包")
 
-            except Empty:
-                continue
             except Exception as e:
                 self.logger.error(f"发送数据错误: {e}")
                 self.stats['errors'] += 1
 
     def _parse_received_data(self):
-        """解析接收到的数据"""
-        while len(self.receive_buffer) >= 5:  # 最小包长度
-            # 查找包头
-            header_index = self.receive_buffer.find(SerialProtocol.PACKET_HEADER)
-            if header_index == -1:
-                # 没有找到包头，清空缓冲区
-                self.logger.warning(f"未找到包头，丢弃 {len(self.receive_buffer)} 字节数据")
-                self.receive_buffer.clear()
-                break
-
-            # 移除包头之前的数据
-            if header_index > 0:
-                self.logger.warning(f"包头前有 {header_index} 字节垃圾数据，已丢弃")
-                self.receive_buffer = self.receive_buffer[header_index:]
-
-            # 检查是否有完整的包
-            if len(self.receive_buffer) < 3:
-                break
-
-            data_len = self.receive_buffer[2]
-            packet_len = 5 + data_len
-
-            if len(self.receive_buffer) < packet_len:
-                self.logger.debug(f"数据包不完整，等待更多数据 (当前:{len(self.receive_buffer)}, 需要:{packet_len})")
-                break  # 数据不完整，等待更多数据
-
-            # 提取数据包
-            packet_data = bytes(self.receive_buffer[:packet_len])
-            self.receive_buffer = self.receive_buffer[packet_len:]
-
-            self.logger.debug(f"提取数据包 ({packet_len}字节): {packet_data.hex(' ')}")
-
-            # 解析数据包
-            result = SerialProtocol.parse_packet(packet_data)
-            if result:
-                command, data = result
-                self.stats['packets_received'] += 1
-
-                self.logger.info(f"✅ 解析成功 - 命令: 0x{command:02X}, 数据长度: {len(data)}, 数据: {data.hex(' ') if len(data) <= 16 else data[:16].hex(' ') + '...'}")
-
-                # 调用回调函数
-                if self.callback:
-                    try:
-                        self.logger.debug(f"调用回调函数，命令: 0x{command:02X}")
-                        self.callback(command, data)
-                    except Exception as e:
-                        self.logger.error(f"回调函数执行错误: {e}")
-                        import traceback
-                        traceback.print_exc()
+        """解析接收到的数据 (通过读游标推进，不再为每个数据包复制缓冲区剩余部分)"""
+        buffer = self.receive_buffer
+        find = buffer.find
+        packet_header = SerialProtocol.PACKET_HEADER
+        calculate_checksum = SerialProtocol.calculate_checksum
+        head = self._rx_head
+        received = 0
+        rx_done = self._rx_done
+        debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+        try:
+            while len(buffer) - head >= 5:  # 最小包长度
+                # 查找包头
+                header_index = find(packet_header, head)
+                if header_index == -1:
+                    # 没有找到包头，丢弃全部未读数据
+                    self.logger.warning(f"未找到包头，丢弃 {len(buffer) - head} 字节数据")
+                    head = len(buffer)
+                    break
+
+                # 跳过包头之前的数据
+                if header_index > head:
+                    self.logger.warning(f"包头前有 {header_index - head} 字节垃圾数据，已丢弃")
+                    head = header_index
+
+                # 检查是否有完整的包
+                if len(buffer) - head < 3:
+                    break
+
+                data_len = buffer[head + 2]
+                packet_len = 5 + data_len
+
+                if len(buffer) - head < packet_len:
+                    self.logger.debug("数据包不完整，等待更多数据 (当前:%d, 需要:%d)", len(buffer) - head, packet_len)
+                    break  # 数据不完整，等待更多数据
+
+                # 提取数据包 (包头与长度已确认，只需校验包尾和校验和)
+                packet_start = head
+                head += packet_len
+                command = buffer[packet_start + 1]
+                if data_len:
+                    data = bytes(buffer[packet_start + 3:head - 2])
+                    checksum = calculate_checksum(command, data_len, data)
                 else:
-                    self.logger.warning("⚠️ 回调函数未设置，数据包被忽略")
+                    # 无数据的数据包 (心跳/确认等)，校验和即为 CMD ^ 0
+                    data = b''
+                    checksum = command
 
-            else:
-                self.logger.warning(f"❌ 数据包校验失败: {packet_data.hex(' ')}")
-                self.stats['errors'] += 1
+                if debug_enabled:
+                    self.logger.debug("提取数据包 (%d字节): %s", packet_len, buffer[packet_start:head].hex(' '))
+
+                if buffer[head - 1] == SerialProtocol.PACKET_FOOTER and buffer[head - 2] == checksum:
+                    received += 1
+
+                    # 每个数据包一条，降为DEBUG级别
+                    if debug_enabled:
+                        self.logger.debug("✅ 解析成功 - 命令: 0x%02X, 数据长度: %d, 数据: %s", command, len(data),
+                                          data.hex(' ') if len(data) <= 16 else data[:16].hex(' ') + '...')
+
+                    # 交给分发线程调用回调函数，接收线程继续读取串口
+                    if self.callback:
+                        rx_done.append((command, data))
+                    else:
+                        self.logger.warning("⚠️ 回调函数未设置，数据包被忽略")
+
+                else:
+                    if self.logger.isEnabledFor(logging.WARNING):
+                        self.logger.warning("❌ 数据包校验失败: %s", buffer[packet_start:head].hex(' '))
+                    self.stats['errors'] += 1
+        finally:
+            # 统计在每轮解析结束时汇总更新一次
+            if received:
+                self.stats['packets_received'] += received
+                self._rx_event.set()  # 每轮解析唤醒一次分发线程
+
+            # 已全部读完时直接清空；已读部分过大时整体前移一次
+            # (clear()与删除前缀都会让bytearray释放多余容量，突发数据后缓冲区随之收缩)
+            if head > self.RX_BUFFER_SOFT_MAX:
+                self.logger.debug("接收缓冲区收缩: 释放 %d 字节已解析数据", head)
+            if head >= len(buffer):
+                buffer.clear()
+                head = 0
+            elif head > self.RX_COMPACT_THRESHOLD:
+                del buffer[:head]
+                head = 0
+            self._rx_head = head
+
+    def _dispatch_worker(self, rx_done: deque, rx_event: threading.Event, stop: threading.Event):
+        """回调分发工作线程 (按接收顺序调用回调函数，避免耗时回调阻塞串口读取)"""
+        popleft = rx_done.popleft
+        while True:
+            try:
+                command, data = popleft()
+            except IndexError:
+                # 队列已空: 连接断开后退出，否则等待接收线程唤醒
+                if stop.is_set():
+                    break
+                rx_event.wait(timeout=1.0)
+                rx_event.clear()
+                continue
+
+            callback = self.callback
+            if callback:
+                try:
+                    self.logger.debug("调用回调函数，命令: 0x%02X", command)
+                    callback(command, data)
+                except Exception as e:
+                    self.logger.error(f"回调函数执行错误: {e}")
+                    import traceback
+                    traceback.print_exc()
 
     def get_connection_info(self) -> Dict:
         """获取连接信息"""
@@ -15,10 +15,57 @@ from datetime import datetime
 from typing import List, Dict, Optional
 import logging
 
+from utils.file_utils import atomic_write_bytes
+
+try:
+    import orjson  # 可选依赖: 更快的JSON编解码
+except ImportError:
+    orjson = None
+
+# 获胜方显示文本
+WINNER_TEXT = {
+    'black': '黑方获胜',
+    'white': '白方获胜',
+    'draw': '平局'
+}
+
+# 游戏模式标识
+MODE_ICONS = {
+    'normal': '🎮',
+    'challenge': '🎯',
+    'timed': '⏱️'
+}
+
+
+def _dumps_json(obj) -> bytes:
+    """序列化为带2空格缩进的UTF-8 JSON字节串 (优先使用orjson，输出格式与json.dump一致)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _dumps_json_line(obj) -> bytes:
+    """序列化为单行UTF-8 JSON字节串 (用于追加日志)"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+def _loads_json(data: bytes):
+    """解析JSON字节串 (优先使用orjson)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 class GameHistoryRecord:
     """游戏历史记录"""
 
+    # 历史记录数量可能较多，使用__slots__省去每个实例的属性字典
+    __slots__ = ('game_id', 'timestamp', '_date_str', '_summary',
+                 'black_count', 'white_count', 'winner', 'status',
+                 'move_count', 'duration', 'game_mode', 'full_data')
+
     def __init__(self, game_data: Dict):
         """
         初始化历史记录
@@ -28,7 +75,8 @@ class GameHistoryRecord:
         """
         self.game_id = game_data.get('game_id', '')
         self.timestamp = game_data.get('timestamp', datetime.now().timestamp())
-        self.date_str = datetime.fromtimestamp(self.timestamp).strftime('%Y-%m-%d %H:%M:%S')
+        self._date_str: Optional[str] = None  # 首次访问date_str时再格式化
+        self._summary: Optional[str] = None
 
         # 游戏结果
         self.black_count = game_data.get('black_count', 0)
@@ -44,31 +92,37 @@ class GameHistoryRecord:
         # 完整游戏数据
         self.full_data = game_data
 
+    @property
+    def date_str(self) -> str:
+        """日期字符串 (按需格式化并缓存)"""
+        date_str = self._date_str
+        if date_str is None:
+            date_str = datetime.fromtimestamp(self.timestamp).strftime('%Y-%m-%d %H:%M:%S')
+            self._date_str = date_str
+        return date_str
+
     def to_dict(self) -> Dict:
         """转换为字典"""
         return self.full_data
 
     def get_summary(self) -> str:
-        """获取摘要信息"""
-        winner_text = {
-            'black': '黑方获胜',
-            'white': '白方获胜',
-            'draw': '平局'
-        }.get(self.winner, '未知')
-
-        # 游戏模式标识
-        mode_icon = {
-            'normal': '🎮',
-            'challenge': '🎯',
-            'timed': '⏱️'
-        }.get(self.game_mode, '🎮')
-
-        return f"{mode_icon} {self.date_str} | {winner_text} | {self.black_count}-{self.white_count} | {self.move_count}手"
+        """获取摘要信息 (按需生成并缓存)"""
+        summary = self._summary
+        if summary is None:
+            winner_text = WINNER_TEXT.get(self.winner, '未知')
+            mode_icon = MODE_ICONS.get(self.game_mode, '🎮')
+            summary = (f"{mode_icon} {self.date_str} | {winner_text} | "
+                       f"{self.black_count}-{self.white_count} | {self.move_count}手")
+            self._summary = summary
+        return summary
 
 
 class GameHistoryManager:
     """游戏历史记录管理器"""
 
+    # 追加日志中的操作数达到该值时合并回快照文件
+    JOURNAL_COMPACT_THRESHOLD = 50
+
     def __init__(self, data_file: str = 'data/game_history.json'):
         """
         初始化历史记录管理器
@@ -77,11 +131,23 @@ class GameHistoryManager:
             data_file: 数据文件路径
         """
         self.data_file = data_file
+        # 追加日志: 新增/删除记录时只追加一行，避免每局都重写整个快照文件
+        self.journal_file = os.path.splitext(data_file)[0] + '.jsonl'
+        self._journal_generation = 0  # 快照合并次数，日志行只对同一代快照有效
+        self._journal_entries = 0
         self.logger = logging.getLogger(__name__)
         self.records: List[GameHistoryRecord] = []
+        # game_id -> 记录 的索引 (ID重复时指向列表中靠前即较新的记录)
+        self._by_id: Dict[str, GameHistoryRecord] = {}
+        self._stats_cache: Optional[Dict] = None  # 统计结果缓存，记录变化时失效
 
         # 加载历史记录
         self._load_history()
+        self._rebuild_index()
+
+    def _rebuild_index(self):
+        """重建game_id索引"""
+        self._by_id = {record.game_id: record for record in reversed(self.records)}
 
     def add_game(self, game_state, game_mode: str = 'normal') -> GameHistoryRecord:
         """
@@ -116,9 +182,11 @@ class GameHistoryManager:
         # 创建记录
         record = GameHistoryRecord(game_data)
         self.records.insert(0, record)  # 最新的在前面
+        self._by_id[game_id] = record
+        self._stats_cache = None
 
-        # 保存到文件
-        self._save_history()
+        # 追加到日志文件
+        self._append_journal({'op': 'add', 'record': game_data})
 
         self.logger.info(f"添加游戏记录: {game_id}")
         return record
@@ -137,10 +205,7 @@ class GameHistoryManager:
         Returns:
             GameHistoryRecord: 历史记录对象，未找到返回None
         """
-        for record in self.records:
-            if record.game_id == game_id:
-                return record
-        return None
+        return self._by_id.get(game_id)
 
     def delete_record(self, game_id: str) -> bool:
         """
@@ -152,17 +217,22 @@ class GameHistoryManager:
         Returns:
             bool: 是否删除成功
         """
-        for i, record in enumerate(self.records):
-            if record.game_id == game_id:
-                self.records.pop(i)
-                self._save_history()
-                self.logger.info(f"删除游戏记录: {game_id}")
-                return True
-        return False
+        record = self._by_id.get(game_id)
+        if record is None:
+            return False
+
+        self.records.remove(record)
+        self._rebuild_index()  # 同ID的其他记录 (如有) 重新进入索引
+        self._stats_cache = None
+        self._append_journal({'op': 'delete', 'game_id': game_id})
+        self.logger.info(f"删除游戏记录: {game_id}")
+        return True
 
     def clear_all(self):
         """清空所有记录"""
         self.records.clear()
+        self._by_id.clear()
+        self._stats_cache = None
         self._save_history()
         self.logger.info("清空所有游戏记录")
 
@@ -173,36 +243,40 @@ class GameHistoryManager:
         Returns:
             Dict: 统计数据
         """
-        total_games = len(self.records)
-        black_wins = sum(1 for r in self.records if r.winner == 'black')
-        white_wins = sum(1 for r in self.records if r.winner == 'white')
-        draws = sum(1 for r in self.records if r.winner == 'draw')
-
-        total_moves = sum(r.move_count for r in self.records)
-        avg_moves = total_moves / total_games if total_games > 0 else 0
-
-        total_duration = sum(r.duration for r in self.records)
-        avg_duration = total_duration / total_games if total_games > 0 else 0
-
-        return {
-            'total_games': total_games,
-            'black_wins': black_wins,
-            'white_wins': white_wins,
-            'draws': draws,
-            'avg_moves': avg_moves,
-            'avg_duration': avg_duration
-        }
+        if self._stats_cache is None:
+            # 一次遍历同时统计胜负、步数和时长
+            total_games = len(self.records)
+            wins = {'black': 0, 'white': 0, 'draw': 0}
+            total_moves = 0
+            total_duration = 0
+            for r in self.records:
+                if r.winner in wins:
+                    wins[r.winner] += 1
+                total_moves += r.move_count
+                total_duration += r.duration
+
+            self._stats_cache = {
+                'total_games': total_games,
+                'black_wins': wins['black'],
+                'white_wins': wins['white'],
+                'draws': wins['draw'],
+                'avg_moves': total_moves / total_games if total_games > 0 else 0,
+                'avg_duration': total_duration / total_games if total_games > 0 else 0
+            }
+
+        return dict(self._stats_cache)
 
     def _load_history(self):
-        """加载历史记录"""
+        """加载历史记录 (快照文件 + 追加日志)"""
         try:
             if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(self.data_file, 'rb') as f:
+                    data = _loads_json(f.read())
 
                 # 加载记录
                 records_data = data.get('records', [])
                 self.records = [GameHistoryRecord(r) for r in records_data]
+                self._journal_generation = data.get('journal_generation', 0)
 
                 self.logger.info(f"已加载 {len(self.records)} 条游戏记录")
             else:
@@ -210,11 +284,73 @@ class GameHistoryManager:
                 os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
                 self.logger.info("游戏历史文件不存在，将创建新文件")
 
+            # 重放上次合并之后追加的操作，并在启动时合并回快照文件
+            if self._replay_journal():
+                self._save_history()
+
         except Exception as e:
             self.logger.error(f"加载游戏历史失败: {e}")
 
+    def _replay_journal(self) -> bool:
+        """
+        重放追加日志中的操作
+
+        Returns:
+            bool: 日志文件是否存在 (存在时需要合并回快照文件)
+        """
+        if not os.path.exists(self.journal_file):
+            return False
+
+        applied = 0
+        with open(self.journal_file, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = _loads_json(line)
+                except ValueError:
+                    # 写入中途退出留下的不完整行，其后的内容不再可信
+                    self.logger.warning("游戏历史日志存在不完整记录，已忽略其后内容")
+                    break
+
+                if entry.get('generation') != self._journal_generation:
+                    continue  # 已合并进快照的旧操作
+
+                if entry['op'] == 'add':
+                    self.records.insert(0, GameHistoryRecord(entry['record']))
+                elif entry['op'] == 'delete':
+                    for i, record in enumerate(self.records):
+                        if record.game_id == entry['game_id']:
+                            self.records.pop(i)
+                            break
+                applied += 1
+
+        self.logger.info(f"已重放 {applied} 条游戏历史日志")
+        return True
+
+    def _append_journal(self, entry: Dict):
+        """
+        追加一条操作到日志文件，累计到阈值时合并回快照文件
+
+        Args:
+            entry: 操作字典 ({'op': 'add', 'record': ...} 或 {'op': 'delete', 'game_id': ...})
+        """
+        try:
+            os.makedirs(os.path.dirname(self.journal_file), exist_ok=True)
+
+            entry['generation'] = self._journal_generation
+            with open(self.journal_file, 'ab') as f:
+                f.write(_dumps_json_line(entry) + b'\n')
+            self._journal_entries += 1
+
+            if self._journal_entries >= self.JOURNAL_COMPACT_THRESHOLD:
+                self._save_history()
+
+        except Exception as e:
+            self.logger.error(f"保存游戏历史失败: {e}")
+
     def _save_history(self):
-        """保存历史记录"""
+        """保存历史记录 (写入完整快照并清空追加日志)"""
         try:
             # 确保目录存在
             os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
@@ -224,12 +360,18 @@ class GameHistoryManager:
                 'version': '1.0',
                 'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'total_records': len(self.records),
+                'journal_generation': self._journal_generation + 1,
                 'records': [r.to_dict() for r in self.records]
             }
 
-            # 保存到文件
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            # 保存到文件 (原子替换，写入中途退出不会留下损坏的快照)
+            atomic_write_bytes(self.data_file, _dumps_json(data))
+
+            # 快照已包含全部记录，旧日志作废 (删除失败时其中的行因代数不符也会被忽略)
+            self._journal_generation += 1
+            self._journal_entries = 0
+            if os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
 
             self.logger.info(f"游戏历史已保存: {len(self.records)} 条记录")
 
@@ -253,8 +395,8 @@ class GameHistoryManager:
                 'records': [r.to_dict() for r in self.records]
             }
 
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with open(filename, 'wb') as f:
+                f.write(_dumps_json(data))
 
             self.logger.info(f"游戏历史已导出到: {filename}")
             return True
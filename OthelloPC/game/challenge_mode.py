@@ -14,6 +14,8 @@ from typing import Optional
 import json
 import os
 
+from utils.file_utils import atomic_write_json
+
 
 @dataclass
 class ChallengeStats:
@@ -225,7 +227,7 @@ class ChallengeMode:
                 'last_updated': datetime.now().isoformat()
             }
 
-            with open(self.stats_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            # Write to a temp file and replace, so a crash never leaves a truncated file
+            atomic_write_json(self.stats_file, data, indent=2)
         except Exception as e:
             print(f"Error saving challenge history: {e}")
@@ -10,9 +10,11 @@ Game State Manager for STM32 Othello PC Client
 """
 
 import json
+import struct
 import time
 from datetime import datetime
 from enum import Enum
+from functools import lru_cache
 from typing import List, Dict, Optional, Tuple
 import logging
 
@@ -33,8 +35,139 @@ class GameStatus(Enum):
     DRAW = 3
     NOT_STARTED = 4
 
+# STM32游戏状态数据 Game_State_Data_t (72字节):
+# 棋盘64字节 + 当前玩家 + 黑子数 + 白子数 + 游戏结束标志 + 走法计数 (little-endian uint32)
+GAME_STATE_DATA_STRUCT = struct.Struct('<64sBBBBI')
+
+# 棋谱记号表: 按 row*8+col 索引 (A1..H8)
+MOVE_NOTATION = tuple(f"{chr(ord('A') + col)}{row + 1}" for row in range(8) for col in range(8))
+
+# 8个方向的 (行增量, 列增量)
+DIRECTIONS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+
+# 对手棋子类型
+OPPONENT = {PieceType.BLACK: PieceType.WHITE, PieceType.WHITE: PieceType.BLACK}
+
+@lru_cache(maxsize=256)
+def unpack_board_values(board_key: bytes) -> Tuple[Tuple[int, ...], ...]:
+    """将GameState.pack()的结果还原为8x8的PieceType.value矩阵 (相同局面直接命中缓存)"""
+    black_bb = int.from_bytes(board_key[:8], 'little')
+    white_bb = int.from_bytes(board_key[8:16], 'little')
+    values = (((black_bb >> i) & 1) | (((white_bb >> i) & 1) << 1) for i in range(64))
+    return tuple(zip(*[values] * 8))
+
+# 位棋盘二进制字符 ('0'/'1') 到棋子数值的转换表
+_BLACK_BIT_TABLE = bytes.maketrans(b'01', bytes((PieceType.EMPTY.value, PieceType.BLACK.value)))
+_WHITE_BIT_TABLE = bytes.maketrans(b'01', bytes((PieceType.EMPTY.value, PieceType.WHITE.value)))
+
+# 棋子数值到黑/白位棋盘二进制字符的转换表 (上表的逆映射)
+_PIECE_VALUES = bytes((PieceType.EMPTY.value, PieceType.BLACK.value, PieceType.WHITE.value))
+_BLACK_VALUE_TABLE = bytes.maketrans(_PIECE_VALUES, b'010')
+_WHITE_VALUE_TABLE = bytes.maketrans(_PIECE_VALUES, b'001')
+
+# 位棋盘掩码: 全部64格 / 去掉第0列 / 去掉第7列
+_FULL_MASK = 0xFFFFFFFFFFFFFFFF
+_NOT_COL_0 = 0xFEFEFEFEFEFEFEFE
+_NOT_COL_7 = 0x7F7F7F7F7F7F7F7F
+
+# 8个方向的 (位移量, 掩码): 位移量 = 行增量*8 + 列增量，
+# 掩码去掉横向移动时越过左右边界绕到另一侧的位
+_DIRECTION_SHIFTS = tuple(
+    (dx * 8 + dy, _NOT_COL_0 if dy > 0 else _NOT_COL_7 if dy < 0 else _FULL_MASK)
+    for dx, dy in DIRECTIONS
+)
+_DIRECTION_SHIFT_BY_DELTA = dict(zip(DIRECTIONS, _DIRECTION_SHIFTS))
+
+def _popcount(bb: int) -> int:
+    """统计位棋盘中置位的格子数"""
+    return bin(bb).count('1')
+
+def _shift(bb: int, shift: int, mask: int) -> int:
+    """将位棋盘沿一个方向整体移动一格"""
+    return ((bb << shift) if shift > 0 else (bb >> -shift)) & mask
+
+def _ray_flip_mask(move_bit: int, own_bb: int, opp_bb: int, shift: int, mask: int) -> int:
+    """计算在move_bit处落子后沿一个方向被翻转的对方棋子位掩码"""
+    # 沿该方向收集连续的对方棋子，遇到己方棋子时整段翻转
+    line = 0
+    x = _shift(move_bit, shift, mask) & opp_bb
+    while x:
+        line |= x
+        x = _shift(x, shift, mask)
+        if x & own_bb:
+            return line
+        x &= opp_bb
+    return 0
+
+def _flip_mask(move_bit: int, own_bb: int, opp_bb: int) -> int:
+    """计算在move_bit处落子后被翻转的对方棋子位掩码 (为0表示不是合法走法)"""
+    flips = 0
+    for shift, mask in _DIRECTION_SHIFTS:
+        flips |= _ray_flip_mask(move_bit, own_bb, opp_bb, shift, mask)
+    return flips
+
+def _legal_moves_mask(own_bb: int, opp_bb: int) -> int:
+    """计算全部合法落子位置的位掩码 (8个方向各做一次填充，同时处理所有格子)"""
+    empty = ~(own_bb | opp_bb) & _FULL_MASK
+    moves = 0
+    for shift, mask in _DIRECTION_SHIFTS:
+        # 从己方棋子出发沿该方向延伸连续的对方棋子 (最多6个)，其后的空格即为合法落子点
+        x = _shift(own_bb, shift, mask) & opp_bb
+        for _ in range(5):
+            x |= _shift(x, shift, mask) & opp_bb
+        moves |= _shift(x, shift, mask) & empty
+    return moves
+
+class _BoardRowView:
+    """棋盘单行视图 (按列读写PieceType)"""
+    __slots__ = ('_state', '_row')
+
+    def __init__(self, state: 'GameState', row: int):
+        self._state = state
+        self._row = row
+
+    def __getitem__(self, col: int) -> PieceType:
+        return self._state.get_piece(self._row, _check_index(col))
+
+    def __setitem__(self, col: int, piece: PieceType):
+        self._state.set_piece(self._row, _check_index(col), piece)
+
+    def __iter__(self):
+        for col in range(8):
+            yield self._state.get_piece(self._row, col)
+
+    def __len__(self):
+        return 8
+
+class _BoardView:
+    """棋盘视图: board[row][col] 形式读写，底层存储为位棋盘"""
+    __slots__ = ('_rows',)
+
+    def __init__(self, state: 'GameState'):
+        self._rows = tuple(_BoardRowView(state, row) for row in range(8))
+
+    def __getitem__(self, row: int) -> _BoardRowView:
+        return self._rows[row]
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return 8
+
+def _check_index(index: int) -> int:
+    """规范化行/列索引 (支持负索引，越界抛出IndexError)"""
+    if -8 <= index < 0:
+        return index + 8
+    if not 0 <= index < 8:
+        raise IndexError("board index out of range")
+    return index
+
 class Move:
     """走法记录"""
+    # 每局最多60余步且随历史记录长期保存，使用__slots__省去每个实例的属性字典
+    __slots__ = ('row', 'col', 'player', 'timestamp', 'flipped_count')
+
     def __init__(self, row: int, col: int, player: PieceType, timestamp: float = None):
         self.row = row
         self.col = col
@@ -44,9 +177,9 @@ class Move:
 
     def to_notation(self) -> str:
         """转换为棋谱记号"""
-        col_char = chr(ord('A') + self.col)
-        row_num = self.row + 1
-        return f"{col_char}{row_num}"
+        if 0 <= self.row < 8 and 0 <= self.col < 8:
+            return MOVE_NOTATION[self.row * 8 + self.col]
+        return f"{chr(ord('A') + self.col)}{self.row + 1}"
 
     def __str__(self):
         return self.to_notation()
@@ -54,7 +187,12 @@ class Move:
 class GameState:
     """游戏状态类"""
     def __init__(self):
-        self.board = [[PieceType.EMPTY for _ in range(8)] for _ in range(8)]
+        # 位棋盘: 第 row*8+col 位表示对应格子
+        self.black_bb = 0
+        self.white_bb = 0
+        self._board_view = _BoardView(self)
+        # 合法落子位掩码缓存: player -> ((黑位棋盘, 白位棋盘), 位掩码)，局面变化后自动失效
+        self._legal_cache: Dict[PieceType, Tuple[Tuple[int, int], int]] = {}
         self.current_player = PieceType.BLACK
         self.black_count = 0
         self.white_count = 0
@@ -65,16 +203,74 @@ class GameState:
         self.moves_history: List[Move] = []
         self.game_mode = 0  # 游戏模式: 0=NORMAL (作弊功能已改为叠加状态)
 
+    @property
+    def board(self) -> _BoardView:
+        """棋盘视图 (board[row][col] 读写PieceType)"""
+        return self._board_view
+
+    @board.setter
+    def board(self, rows):
+        self.set_board(rows)
+
+    def get_piece(self, row: int, col: int) -> PieceType:
+        """获取指定格子的棋子"""
+        bit = 1 << (row * 8 + col)
+        if self.black_bb & bit:
+            return PieceType.BLACK
+        if self.white_bb & bit:
+            return PieceType.WHITE
+        return PieceType.EMPTY
+
+    def set_piece(self, row: int, col: int, piece: PieceType):
+        """设置指定格子的棋子 (覆盖原有棋子)"""
+        bit = 1 << (row * 8 + col)
+        self.black_bb &= ~bit
+        self.white_bb &= ~bit
+        if piece == PieceType.BLACK:
+            self.black_bb |= bit
+        elif piece == PieceType.WHITE:
+            self.white_bb |= bit
+
+    def set_board(self, rows):
+        """从8x8的PieceType (或其数值) 矩阵设置整个棋盘"""
+        black_bb = 0
+        white_bb = 0
+        bit = 1
+        for board_row in rows:
+            for piece in board_row:
+                piece = PieceType(piece)
+                if piece == PieceType.BLACK:
+                    black_bb |= bit
+                elif piece == PieceType.WHITE:
+                    white_bb |= bit
+                bit <<= 1
+        self.black_bb = black_bb
+        self.white_bb = white_bb
+
+    def set_board_bytes(self, board_bytes: bytes):
+        """从64字节的棋子数值 (0=空, 1=黑, 2=白) 设置整个棋盘"""
+        board_bytes = bytes(board_bytes[:64])
+        invalid = board_bytes.translate(None, _PIECE_VALUES)
+        if invalid:
+            raise ValueError(f"{invalid[0]} is not a valid PieceType")
+
+        # 每字节映射为'0'/'1'字符，反转后第i个字节即为第i位 (board_bytes()的逆过程)
+        black = board_bytes.translate(_BLACK_VALUE_TABLE)[::-1]
+        white = board_bytes.translate(_WHITE_VALUE_TABLE)[::-1]
+        self.black_bb = int(black, 2) if black else 0
+        self.white_bb = int(white, 2) if white else 0
+
+    def _player_boards(self, player: PieceType) -> Tuple[int, int]:
+        """返回 (己方位棋盘, 对方位棋盘)"""
+        if player == PieceType.BLACK:
+            return self.black_bb, self.white_bb
+        return self.white_bb, self.black_bb
+
     def start_new_game(self):
         """开始新游戏"""
-        # 清空棋盘
-        self.board = [[PieceType.EMPTY for _ in range(8)] for _ in range(8)]
-
-        # 设置初始位置
-        self.board[3][3] = PieceType.BLACK  # D4
-        self.board[4][4] = PieceType.BLACK  # E5
-        self.board[3][4] = PieceType.WHITE  # E4
-        self.board[4][3] = PieceType.WHITE  # D5
+        # 设置初始位置: 黑 D4/E5，白 E4/D5
+        self.black_bb = (1 << 27) | (1 << 36)
+        self.white_bb = (1 << 28) | (1 << 35)
 
         self.current_player = PieceType.BLACK
         self.black_count = 2
@@ -92,17 +288,19 @@ class GameState:
 
         # 记录走法
         move = Move(row, col, player)
-        flipped_count = 0
 
-        # 放置棋子
-        self.board[row][col] = player
-
-        # 翻转棋子
-        directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-        for dx, dy in directions:
-            flipped_count += self._flip_pieces_in_direction(row, col, dx, dy, player)
+        # 放置棋子并翻转8个方向上被夹住的对方棋子
+        move_bit = 1 << (row * 8 + col)
+        own_bb, opp_bb = self._player_boards(player)
+        flip_mask = _flip_mask(move_bit, own_bb, opp_bb)
+        own_bb |= move_bit | flip_mask
+        opp_bb &= ~flip_mask
+        if player == PieceType.BLACK:
+            self.black_bb, self.white_bb = own_bb, opp_bb
+        else:
+            self.white_bb, self.black_bb = own_bb, opp_bb
 
-        move.flipped_count = flipped_count
+        move.flipped_count = _popcount(flip_mask)
         self.moves_history.append(move)
 
         # 更新游戏状态
@@ -120,7 +318,8 @@ class GameState:
         if not (0 <= row < 8 and 0 <= col < 8):
             return False
 
-        if self.board[row][col] != PieceType.EMPTY:
+        move_bit = 1 << (row * 8 + col)
+        if (self.black_bb | self.white_bb) & move_bit:
             return False
 
         # 必须是游戏进行中状态
@@ -128,81 +327,70 @@ class GameState:
             return False
 
         # 检查是否能翻转对手棋子
-        directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-        for dx, dy in directions:
-            if self._can_flip_in_direction(row, col, dx, dy, player):
-                return True
-
-        return False
+        return bool(self._legal_moves_bb(player) & move_bit)
 
     def get_valid_moves(self, player: PieceType) -> List[Tuple[int, int]]:
         """获取所有有效走法"""
+        # 必须是游戏进行中状态
+        if self.status != GameStatus.PLAYING:
+            return []
+
+        moves_bb = self._legal_moves_bb(player)
         valid_moves = []
-        for row in range(8):
-            for col in range(8):
-                if self.is_valid_move(row, col, player):
-                    valid_moves.append((row, col))
+        while moves_bb:
+            # 按 row*8+col 从小到大取出最低置位
+            lowest = moves_bb & -moves_bb
+            index = lowest.bit_length() - 1
+            valid_moves.append((index >> 3, index & 7))
+            moves_bb ^= lowest
         return valid_moves
 
+    def _legal_moves_bb(self, player: PieceType) -> int:
+        """获取合法落子位掩码 (局面未变化时直接使用缓存)"""
+        position = (self.black_bb, self.white_bb)
+        cached = self._legal_cache.get(player)
+        if cached is not None and cached[0] == position:
+            return cached[1]
+
+        moves_bb = _legal_moves_mask(*self._player_boards(player))
+        self._legal_cache[player] = (position, moves_bb)
+        return moves_bb
+
+    def _has_valid_moves(self, player: PieceType) -> bool:
+        """检查是否存在有效走法 (不生成走法列表)"""
+        return self.status == GameStatus.PLAYING and self._legal_moves_bb(player) != 0
+
     def _flip_pieces_in_direction(self, row: int, col: int, dx: int, dy: int, player: PieceType) -> int:
-        """在指定方向翻转棋子"""
-        opponent = PieceType.WHITE if player == PieceType.BLACK else PieceType.BLACK
-        flipped = 0
-        check_row, check_col = row + dx, col + dy
-
-        # 寻找对手棋子
-        to_flip = []
-        while (0 <= check_row < 8 and 0 <= check_col < 8 and
-               self.board[check_row][check_col] == opponent):
-            to_flip.append((check_row, check_col))
-            check_row, check_col = check_row + dx, check_col + dy
-
-        # 检查是否以己方棋子结束
-        if (0 <= check_row < 8 and 0 <= check_col < 8 and
-            self.board[check_row][check_col] == player and len(to_flip) > 0):
-            # 执行翻转
-            for flip_row, flip_col in to_flip:
-                self.board[flip_row][flip_col] = player
-                flipped += 1
-
-        return flipped
-
-    def _can_flip_in_direction(self, row: int, col: int, dx: int, dy: int, player: PieceType) -> bool:
-        """检查在指定方向是否可以翻转"""
-        opponent = PieceType.WHITE if player == PieceType.BLACK else PieceType.BLACK
-        check_row, check_col = row + dx, col + dy
-        found_opponent = False
-
-        while 0 <= check_row < 8 and 0 <= check_col < 8:
-            if self.board[check_row][check_col] == opponent:
-                found_opponent = True
-            elif self.board[check_row][check_col] == player:
-                return found_opponent
-            else:
-                break
-            check_row, check_col = check_row + dx, check_col + dy
+        """在指定方向翻转棋子 (作弊模式直接放置棋子时使用)"""
+        own_bb, opp_bb = self._player_boards(player)
+        shift, mask = _DIRECTION_SHIFT_BY_DELTA[(dx, dy)]
+        flip_mask = _ray_flip_mask(1 << (row * 8 + col), own_bb, opp_bb, shift, mask)
+        if not flip_mask:
+            return 0
 
-        return False
+        # 执行翻转
+        if player == PieceType.BLACK:
+            self.black_bb |= flip_mask
+            self.white_bb &= ~flip_mask
+        else:
+            self.white_bb |= flip_mask
+            self.black_bb &= ~flip_mask
+
+        return _popcount(flip_mask)
 
     def _update_piece_counts(self):
         """更新棋子计数"""
-        self.black_count = 0
-        self.white_count = 0
-        for row in range(8):
-            for col in range(8):
-                if self.board[row][col] == PieceType.BLACK:
-                    self.black_count += 1
-                elif self.board[row][col] == PieceType.WHITE:
-                    self.white_count += 1
+        self.black_count = _popcount(self.black_bb)
+        self.white_count = _popcount(self.white_bb)
 
     def _switch_player(self):
         """切换当前玩家"""
-        next_player = PieceType.WHITE if self.current_player == PieceType.BLACK else PieceType.BLACK
+        next_player = OPPONENT.get(self.current_player, PieceType.BLACK)
 
         # 检查下一个玩家是否有有效走法
-        if self.get_valid_moves(next_player):
+        if self._has_valid_moves(next_player):
             self.current_player = next_player
-        elif self.get_valid_moves(self.current_player):
+        elif self._has_valid_moves(self.current_player):
             # 下一个玩家无法走棋，当前玩家继续
             pass
         else:
@@ -217,7 +405,7 @@ class GameState:
         if total_pieces == 64:
             logger.info("[GAME_CHECK] ✅ 棋盘已满，游戏结束")
             self._end_game()
-        elif not self.get_valid_moves(PieceType.BLACK) and not self.get_valid_moves(PieceType.WHITE):
+        elif not self._has_valid_moves(PieceType.BLACK) and not self._has_valid_moves(PieceType.WHITE):
             logger.info("[GAME_CHECK] ✅ 双方无合法走法，游戏结束")
             self._end_game()
         else:
@@ -248,10 +436,26 @@ class GameState:
         end_time = self.game_end_time if self.game_end_time else time.time()
         return end_time - self.game_start_time
 
+    def pack(self) -> bytes:
+        """
+        将棋盘压缩为16字节 (黑子位棋盘 + 白子位棋盘，各8字节little-endian)
+
+        第 row*8+col 位表示对应格子，可作为局面的哈希/缓存键
+        """
+        return self.black_bb.to_bytes(8, 'little') + self.white_bb.to_bytes(8, 'little')
+
+    def board_bytes(self) -> bytes:
+        """返回64字节的棋子数值 (0=空, 1=黑, 2=白)，按 row*8+col 顺序排列"""
+        # 64位二进制串逐字符映射为棋子数值 (高位在前，按big-endian读取后第i字节即第i位)；
+        # 黑白位置互不重叠，两者相加即为合并结果
+        black = format(self.black_bb, '064b').encode().translate(_BLACK_BIT_TABLE)
+        white = format(self.white_bb, '064b').encode().translate(_WHITE_BIT_TABLE)
+        return (int.from_bytes(black, 'big') + int.from_bytes(white, 'big')).to_bytes(64, 'little')
+
     def to_dict(self) -> Dict:
         """转换为字典格式"""
         return {
-            'board': [[piece.value for piece in row] for row in self.board],
+            'board': [list(row) for row in unpack_board_values(self.pack())],
             'current_player': self.current_player.value,
             'black_count': self.black_count,
             'white_count': self.white_count,
@@ -266,7 +470,7 @@ class GameState:
 
     def from_dict(self, data: Dict):
         """从字典数据恢复状态"""
-        self.board = [[PieceType(piece) for piece in row] for row in data['board']]
+        self.set_board(data['board'])
         self.current_player = PieceType(data['current_player'])
         self.black_count = data['black_count']
         self.white_count = data['white_count']
@@ -331,32 +535,28 @@ class GameStateManager:
 
     def update_board_state(self, board_data: bytes):
         """从STM32更新完整游戏状态"""
-        import struct
-
         # 检查数据长度（Game_State_Data_t = 72 bytes）
-        if len(board_data) < 72:
-            logger.error(f"❌ 游戏状态数据不完整: 接收{len(board_data)}字节, 期望72字节")
+        if len(board_data) < GAME_STATE_DATA_STRUCT.size:
+            logger.error(f"❌ 游戏状态数据不完整: 接收{len(board_data)}字节, 期望{GAME_STATE_DATA_STRUCT.size}字节")
             return
 
         try:
+            # 一次解析全部字段
+            (board_bytes, current_player_value, black_count, white_count,
+             game_over, incoming_move_count) = GAME_STATE_DATA_STRUCT.unpack_from(board_data)
+
             # ========== 1. 解析棋盘数据 (0-63字节) ==========
-            for i in range(64):
-                row = i // 8
-                col = i % 8
-                piece_value = board_data[i]
-                self.current_game.board[row][col] = PieceType(piece_value)
+            self.current_game.set_board_bytes(board_bytes)
 
             # ========== 2. 解析当前玩家 (64字节) ⚠️ 关键修复 ==========
-            current_player_value = board_data[64]
             old_player = self.current_game.current_player
             self.current_game.current_player = PieceType(current_player_value)
 
             # ========== 3. 解析棋子计数 (65-66字节) ==========
-            self.current_game.black_count = board_data[65]
-            self.current_game.white_count = board_data[66]
+            self.current_game.black_count = black_count
+            self.current_game.white_count = white_count
 
             # ========== 4. 解析游戏结束标志 (67字节) ==========
-            game_over = board_data[67]
             if game_over == 1:
                 # 根据分数判断结果
                 if self.current_game.black_count > self.current_game.white_count:
@@ -368,10 +568,7 @@ class GameStateManager:
             else:
                 self.current_game.status = GameStatus.PLAYING
 
-            # ========== 5. 解析走法计数 (68-71字节, little-endian uint32) ==========
-            incoming_move_count = struct.unpack('<I', board_data[68:72])[0]
-
-            # ========== 版本号保护：拒绝旧状态包 ==========
+            # ========== 5. 走法计数 (68-71字节) 版本号保护：拒绝旧状态包 ==========
             if incoming_move_count < self.current_game.move_count:
                 logger.warning(
                     f"⚠️ 拒绝旧状态包 | "
@@ -416,15 +613,15 @@ class GameStateManager:
 
         pgn_lines.append('')
 
-        # 添加走法
-        moves_line = ""
+        # 添加走法 (收集后一次拼接)
+        move_parts = []
         for i, move in enumerate(self.current_game.moves_history):
             if i % 2 == 0:  # 黑方走法
-                moves_line += f"{i//2 + 1}.{move.to_notation()} "
+                move_parts.append(f"{i//2 + 1}.{move.to_notation()}")
             else:  # 白方走法
-                moves_line += f"{move.to_notation()} "
+                move_parts.append(move.to_notation())
 
-        pgn_lines.append(moves_line.strip())
+        pgn_lines.append(' '.join(move_parts))
         return '\n'.join(pgn_lines)
 
     def save_game(self, filename: str):
@@ -11,7 +11,7 @@ Simple AI for STM32 Othello PC Client
 
 import random
 from typing import List, Tuple, Optional
-from game.game_state import GameState, PieceType
+from game.game_state import GameState, PieceType, DIRECTIONS, OPPONENT
 
 
 class SimpleAI:
@@ -94,14 +94,7 @@ class SimpleAI:
         Returns:
             有效走法列表 [(row, col), ...]
         """
-        valid_moves = []
-
-        for row in range(8):
-            for col in range(8):
-                if game_state.is_valid_move(row, col, player):
-                    valid_moves.append((row, col))
-
-        return valid_moves
+        return game_state.get_valid_moves(player)
 
     def _count_flips(self, game_state: GameState, row: int, col: int, player: PieceType) -> int:
         """
@@ -120,9 +113,8 @@ class SimpleAI:
             return 0
 
         total_flips = 0
-        directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
 
-        for dx, dy in directions:
+        for dx, dy in DIRECTIONS:
             flips = self._count_flips_in_direction(game_state, row, col, dx, dy, player)
             total_flips += flips
 
@@ -144,7 +136,7 @@ class SimpleAI:
         Returns:
             该方向上可翻转的棋子数量
         """
-        opponent = PieceType.WHITE if player == PieceType.BLACK else PieceType.BLACK
+        opponent = OPPONENT.get(player, PieceType.BLACK)
         flips = 0
         x, y = row + dx, col + dy
 
@@ -17,7 +17,6 @@ from typing import Dict, Optional
 
 from gui.styles import DieterStyle, DieterWidgets
 from analysis.deepseek_client import DeepSeekClient
-from analysis.pdf_generator import PDFReportGenerator
 from game.game_state import GameState
 
 class AnalysisReportWindow:
@@ -463,7 +462,8 @@ AI分析: DeepSeek API
                 self.export_btn.config(state='disabled')
                 self.window.update()
 
-                # 创建PDF生成器
+                # 创建PDF生成器 (延迟导入reportlab)
+                from analysis.pdf_generator import PDFReportGenerator
                 pdf_gen = PDFReportGenerator(filename)
 
                 # 添加报告头部
@@ -26,7 +26,7 @@ from gui.leaderboard_window import LeaderboardWindow
 from gui.analysis_window import AnalysisReportWindow
 from gui.player_select_window import PlayerSelectWindow
 from communication.serial_handler import SerialHandler
-from game.game_state import GameStateManager, PieceType, GameStatus
+from game.game_state import GameStateManager, PieceType, GameStatus, DIRECTIONS
 from game.score_manager import ScoreManager
 from game.leaderboard import Leaderboard
 from game.challenge_mode import ChallengeMode
@@ -801,10 +801,7 @@ class MainWindow:
                 game_state.board[row][col] = piece_color
 
                 # 翻转对手棋子（调用翻转逻辑）
-                opponent = PieceType.WHITE if piece_color == PieceType.BLACK else PieceType.BLACK
-
-                directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-                for dx, dy in directions:
+                for dx, dy in DIRECTIONS:
                     game_state._flip_pieces_in_direction(row, col, dx, dy, piece_color)
 
                 # 更新棋子计数
@@ -274,9 +274,7 @@ class OthelloPC:
                             status = 'connected' if is_connected else 'disconnected'
                             self.main_window.update_connection_status(status)
 
-                    # 发送心跳包
-                    if self.serial_handler and self.serial_handler.is_connected():
-                        self.serial_handler.send_heartbeat()
+                    # 心跳包由串口发送线程按间隔自动发送
 
                     time.sleep(1)  # 每秒执行一次
 
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AnalysisCache Tests for STM32 Othello PC Client
+分析缓存测试
+
+@author: STM32 Othello Project Team
+@version: 1.0
+@date: 2026-10-16
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis.deepseek_client import AnalysisCache
+from game.game_state import GameState, PieceType
+
+
+class AnalysisCacheInflightTest(unittest.TestCase):
+    """相同键并发请求共享计算的测试"""
+
+    def test_cancelled_first_caller_does_not_cancel_others(self):
+        """第一个请求被取消后，其他等待同一键的请求仍能拿到结果"""
+        async def scenario():
+            cache = AnalysisCache()
+            release = asyncio.Event()
+            calls = []
+
+            async def compute():
+                calls.append(1)
+                await release.wait()
+                return {'success': True, 'analysis': 'ok'}
+
+            first = asyncio.ensure_future(cache.get_or_compute(b'key', compute))
+            second = asyncio.ensure_future(cache.get_or_compute(b'key', compute))
+            await asyncio.sleep(0)
+
+            first.cancel()
+            await asyncio.sleep(0)
+            release.set()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await first
+            self.assertEqual(await second, {'success': True, 'analysis': 'ok'})
+            self.assertEqual(len(calls), 1)
+            self.assertEqual(cache.get(b'key'), {'success': True, 'analysis': 'ok'})
+
+        asyncio.run(scenario())
+
+    def test_failure_is_shared_and_not_cached(self):
+        """计算失败时所有等待者收到同一异常，且结果不进入缓存"""
+        async def scenario():
+            cache = AnalysisCache()
+
+            async def compute():
+                await asyncio.sleep(0)
+                raise RuntimeError('api down')
+
+            results = await asyncio.gather(cache.get_or_compute(b'key', compute),
+                                           cache.get_or_compute(b'key', compute),
+                                           return_exceptions=True)
+            self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+            self.assertIsNone(cache.get(b'key'))
+
+        asyncio.run(scenario())
+
+
+class AnalysisCacheKeyTest(unittest.TestCase):
+    """缓存键的测试"""
+
+    def test_key_distinguishes_side_to_move_and_move_count(self):
+        """相同棋盘但当前玩家或手数不同时生成不同的键"""
+        cache = AnalysisCache()
+        state = GameState()
+        key = cache.get_cache_key(state)
+
+        state.current_player = PieceType.WHITE
+        white_key = cache.get_cache_key(state)
+        state.move_count = 2
+        later_key = cache.get_cache_key(state)
+
+        self.assertEqual(len({key, white_key, later_key}), 3)
+        self.assertEqual(key[:AnalysisCache.BOARD_KEY_SIZE],
+                         later_key[:AnalysisCache.BOARD_KEY_SIZE])
+
+    def test_history_digest_depends_on_move_order(self):
+        """走法顺序不同的对局生成不同的历史摘要"""
+        cache = AnalysisCache()
+        first, second = GameState(), GameState()
+        first.start_new_game()
+        second.start_new_game()
+        self.assertTrue(first.make_move(2, 4, PieceType.BLACK))
+        self.assertTrue(second.make_move(4, 2, PieceType.BLACK))
+
+        self.assertNotEqual(cache.get_history_digest(first), cache.get_history_digest(second))
+        self.assertEqual(cache.get_history_digest(GameState()),
+                         cache.get_history_digest(GameState()))
+
+    def test_similar_position_only_returned_with_its_key(self):
+        """相似局面不会被get()当作精确结果返回，get_similar()同时返回实际匹配的键"""
+        cache = AnalysisCache(similarity_threshold=0.9)
+        state = GameState()
+        state.start_new_game()
+        key = cache.get_cache_key(state)
+        cache.put(key, {'success': True, 'analysis': 'start'})
+
+        state.white_bb |= 1 << 0  # 只差一个格子的局面
+        similar_key = cache.get_cache_key(state)
+
+        self.assertIsNone(cache.get(similar_key))
+        self.assertEqual(cache.get_similar(similar_key), (key, {'success': True, 'analysis': 'start'}))
+        self.assertEqual(cache.get_similar(key)[0], key)
+
+
+class AnalysisCachePersistenceTest(unittest.TestCase):
+    """缓存文件写回的测试"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.temp_dir.name, 'analysis_cache.json')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_put_defers_write_until_close(self):
+        """put()不直接写文件，close()时写入尚未保存的结果"""
+        cache = AnalysisCache(cache_file=self.cache_file)
+        cache.put(b'key', {'success': True, 'analysis': 'ok'})
+        self.assertFalse(os.path.exists(self.cache_file))
+
+        cache.close()
+        reloaded = AnalysisCache(cache_file=self.cache_file)
+        self.assertEqual(reloaded.get(b'key'), {'success': True, 'analysis': 'ok'})
+
+    def test_computed_result_is_written_in_background(self):
+        """get_or_compute得到的结果由后台任务写回缓存文件"""
+        async def scenario():
+            cache = AnalysisCache(cache_file=self.cache_file)
+
+            async def compute():
+                return {'success': True, 'analysis': 'ok'}
+
+            await cache.get_or_compute(b'key', compute)
+            await cache._flush_task
+
+        asyncio.run(scenario())
+        reloaded = AnalysisCache(cache_file=self.cache_file)
+        self.assertEqual(reloaded.get(b'key'), {'success': True, 'analysis': 'ok'})
+
+
+if __name__ == '__main__':
+    unittest.main()
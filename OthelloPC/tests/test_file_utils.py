@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File Utilities Tests for STM32 Othello PC Client
+文件工具测试
+
+@author: STM32 Othello Project Team
+@version: 1.0
+@date: 2026-10-16
+"""
+
+import os
+import stat
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.file_utils import atomic_write_bytes
+
+
+@unittest.skipIf(os.name == 'nt', "Windows仅支持只读权限位")
+class AtomicWritePermissionTest(unittest.TestCase):
+    """原子写入后文件权限的测试"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'game_history.json')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _mode(self) -> int:
+        return stat.S_IMODE(os.stat(self.path).st_mode)
+
+    def test_existing_file_keeps_its_mode(self):
+        """替换已存在的文件时保留其原有权限"""
+        atomic_write_bytes(self.path, b'old')
+        os.chmod(self.path, 0o640)
+
+        atomic_write_bytes(self.path, b'new')
+        self.assertEqual(self._mode(), 0o640)
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), b'new')
+
+    def test_new_file_uses_umask_default(self):
+        """新建文件使用0o666去掉umask后的默认权限，而不是临时文件的0600"""
+        umask = os.umask(0)
+        os.umask(umask)
+
+        atomic_write_bytes(self.path, b'data')
+        self.assertEqual(self._mode(), 0o666 & ~umask)
+
+
+if __name__ == '__main__':
+    unittest.main()
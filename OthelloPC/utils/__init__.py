@@ -11,5 +11,6 @@ Utilities Package for STM32 Othello PC Client
 
 from .logger import Logger
 from .config import Config
+from .file_utils import atomic_write_bytes, atomic_write_json
 
-__all__ = ['Logger', 'Config']
\ No newline at end of file
+__all__ = ['Logger', 'Config', 'atomic_write_bytes', 'atomic_write_json']
\ No newline at end of file
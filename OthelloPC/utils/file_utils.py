@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File Utilities for STM32 Othello PC Client
+文件工具模块
+
+@author: STM32 Othello Project Team
+@version: 1.0
+@date: 2026-10-16
+"""
+
+import json
+import os
+import stat
+import tempfile
+from typing import Any
+
+
+def _default_file_mode() -> int:
+    """新建文件的默认权限 (0o666去掉当前umask，与open()新建文件一致)"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+# 读取umask需要临时修改进程umask (非线程安全)，因此只在导入时读取一次
+_DEFAULT_FILE_MODE = _default_file_mode()
+
+
+def atomic_write_bytes(path: str, data: bytes):
+    """
+    原子写入文件
+
+    先写入同目录下的临时文件并fsync，再通过os.replace替换目标文件，
+    写入过程中崩溃或断电不会留下损坏的文件。目标文件已存在时保留其原有权限，
+    否则使用默认权限 (mkstemp创建的临时文件权限为0600)。
+
+    Args:
+        path: 目标文件路径
+        data: 要写入的字节串
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = _DEFAULT_FILE_MODE
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_json(path: str, data: Any, **dump_kwargs):
+    """
+    原子写入JSON文件 (见atomic_write_bytes)
+
+    Args:
+        path: 目标文件路径
+        data: 要序列化的数据
+        **dump_kwargs: 传递给json.dumps的参数 (如indent)
+    """
+    atomic_write_bytes(path, json.dumps(data, ensure_ascii=False, **dump_kwargs).encode('utf-8'))